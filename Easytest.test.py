@@ -1,5 +1,34 @@
 import Easytest
 import time
+import asyncio
+import io
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+import pstats
+import json
+import xml.etree.ElementTree as ElementTree
+from contextlib import redirect_stdout
+
+from easytest.ColorPrint import BufferedStream
+from easytest.Reporter import Reporter, QuietReporter, ColorReporter, CombinedReporter, JsonLinesReporter, JUnitXmlReporter
+from easytest.Expect import Expect
+from easytest.MessageHandler import _MessageHandler
+from easytest import Scheduler
+from easytest import Benchmark
+from easytest.Watch import Watch
+from easytest.Discovery import Discovery, findTestFiles, loadModule, suiteClasses
+from easytest.exceptions import ExpectationFailure, TimeoutFailure
+from easytest.helpers import shortrepr, firstMismatch
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError: # the array matchers are only tested if numpy is installed
+    numpy = None
 
 class Tester(Easytest.TestSuite):
     def passTest(self):
@@ -57,6 +86,28 @@ class Tester(Easytest.TestSuite):
         })
 
 
+    def passSubsetCollectionsTest(self):
+        self.expect((1,"2")).toBeSubset([int, "2", 3])
+        self.expect({1,2}).toBeSubset({1,2,3})
+        self.expect({1,2}).toBeSubset({int})
+        self.expect(OrderedDict(a=(1,2))).toBeSubset({"a":[int]})
+        deep = expected = []
+        for _ in range(10000): # deeper than the recursion limit
+            deep = [deep]
+            expected = [expected, "unused"]
+        self.expect(deep).toBeSubset(expected)
+
+    def passCompiledSubsetTest(self):
+        matcher = Easytest.compileSubset({"id": int, "tags": [str], "meta": {"ok": True}})
+        self.expect({"id": 1, "tags": ["a"]}).toBeSubset(matcher)
+        self.expect({"id": "1"}).Not.toBeSubset(matcher)
+
+    def failCompiledSubsetTest(self):
+        self.expect({"id": 1, "tags": ["a", 2]}).toBeSubset(Easytest.compileSubset({"id": int, "tags": [str]}))
+
+    def failSubsetSetTest(self):
+        self.expect({1,4}).toBeSubset({1,2,3})
+
     def failSubset1Test(self):
         self.expect({"test":3}).toBeSubset({"test":4})
 
@@ -161,11 +212,314 @@ class Tester(Easytest.TestSuite):
     def failCloseToTest(self):
         self.expect(3).toBeCloseTo(3.141592)
 
+    def passEachTest(self):
+        self.expect.each(range(1, 100000)).toBeGreaterThan(0)
+        self.expect.each(["ab", "abc"]).toMatch(r"^ab")
+        self.expect.each([{"id": 1}, {"id": 2}]).toBeSubset({"id": int})
+        self.expect.each([1, 2]).Not.toBeNone()
+        Expect.each([0.001, -0.001]).toBeCloseTo(0)
+
+    def failEachTest(self):
+        self.expect.each(i - 5 for i in range(1000)).toBeGreaterThanOrEqual(0)
+
+    async def passAsyncTest(self):
+        await asyncio.sleep(0.1)
+        self.expect("awaited").toEqual("awaited")
+
+    async def failAsyncTest(self):
+        self.it("should fail after awaiting")
+        await asyncio.sleep(0.1)
+        self.expect("awaited").Not.toEqual("awaited")
+
+
+class AsyncTester(Easytest.TestSuite):
+    async def beforeEach(self):
+        await asyncio.sleep(0)
+        self.setUp = True
+
+    async def firstSlowTest(self):
+        await asyncio.sleep(0.5)
+        self.expect(self.setUp).toBeTruthy()
+
+    async def secondSlowTest(self):
+        self.it("should keep its own context while other tests run")
+        await asyncio.sleep(0.5)
+        self.expect(self._currently_running).toEqual("secondSlowTest")
+        1/0
+
+    async def thirdSlowTest(self):
+        await asyncio.sleep(0.5)
+        self.expect(self._currently_running).toEqual("thirdSlowTest")
+
+
+class ArrayTester(Easytest.TestSuite):
+    def beforeEach(self):
+        self.array = numpy.linspace(0, 1, 1000000)
+
+    def passArrayEqualTest(self):
+        self.expect(self.array).toEqual(self.array.copy())
+        self.expect(numpy.zeros(3)).toEqual(0)
+        self.expect(self.array).Not.toEqual(self.array[:10])
+
+    def failArrayEqualTest(self):
+        other = self.array.copy()
+        other[[3, 500, 999999]] = -1
+        self.expect(self.array).toEqual(other)
+
+    def passArrayCloseTest(self):
+        self.expect(self.array + 1e-4).toBeCloseTo(self.array, 3)
+        self.expect(self.array * (1 + 1e-7)).toBeAllClose(self.array)
+        self.expect(1.0 + 1e-9).toBeAllClose(1.0)
+        self.expect(self.array).toHaveShape((1000000,))
+        self.expect(self.array).toHaveDtype("float64")
+
+    def failArrayCloseTest(self):
+        self.expect(self.array + 1e-4).toBeAllClose(self.array)
+
+    def failShapeTest(self):
+        self.expect(self.array.reshape(1000, 1000)).toEqual(self.array)
+
+
+class DependentTester(Easytest.TestSuite):
+    def usesATest(self):
+        import dependency_a
+        self.expect(dependency_a.value()).toEqual("a")
+
+    def usesBTest(self):
+        import dependency_b
+        self.expect(dependency_b.value()).toEqual("b")
+
+    def failUsesNothingTest(self):
+        self.expect(1).toEqual(2)
+
+
+class TimeoutTester(Easytest.TestSuite):
+    testTimeout = 2
+
+    def passQuickTest(self):
+        time.sleep(0.01)
+
+    @Easytest.timeout(0.2)
+    def failSleepTest(self):
+        time.sleep(5)
+
+    @Easytest.timeout(0.2)
+    def failSwallowTest(self):
+        try:
+            time.sleep(5)
+        except Exception:
+            pass # a timeout is not an Exception, so the test is still stopped
+
+    @Easytest.timeout(0.2)
+    async def failAsyncSleepTest(self):
+        await asyncio.sleep(5)
+
+
+generatedCases=[]
+
+def squareCases():
+    for n in range(1000):
+        generatedCases.append(n)
+        yield n, n*n
+
+class ParametrizedTester(Easytest.TestSuite):
+    @Easytest.parametrize([(1, 1, 2), (2, 3, 5), (2, 2, 5)])
+    def addTest(self, a, b, expected):
+        self.expect(a + b).toEqual(expected)
+
+    @Easytest.parametrize(squareCases)
+    def squareTest(self, n, square):
+        self.expect(n ** 2).toEqual(square)
+
+    @Easytest.parametrize(["a", "bb"])
+    def stringTest(self, string):
+        self.expect(string).toBeInstanceOf(str)
+
+    @Easytest.parametrize([0.01, 0.02])
+    async def sleepTest(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+class MemoryTester(Easytest.TestSuite):
+    cacheDir=None
+
+    def keepMegabyteTest(self):
+        self.kept=bytearray(10**6)
+
+    def dropMegabyteTest(self):
+        data=bytearray(10**6)
+        del data
+
+    def smallTest(self):
+        self.expect(sum(range(100))).toEqual(4950)
+
+    def nestedTest(self):
+        self.list=[0]*10**5 # allocated before the expectation, not counted by it
+        self.expect(lambda: [0]*100).toAllocateLessThan(10**4)
+
+
+def fibonacci(n):
+    return n if n < 2 else fibonacci(n-1) + fibonacci(n-2)
+
+def prepare():
+    return list(range(100))
+
+class BaselineTester(Easytest.TestSuite):
+    def sumTest(self):
+        self.expect(lambda: sum(range(100))).toNotRegressAgainst("baseline sum", tolerance=100, repeat=3)
+
+
+class ProfiledTester(Easytest.TestSuite):
+    cacheDir=None
+
+    def beforeEach(self):
+        prepare() # not profiled
+
+    def fibonacciTest(self):
+        self.expect(fibonacci(22)).toEqual(17711)
+
+    def sortTest(self):
+        self.expect(sorted(range(1000), key=lambda n: -n)[0]).toEqual(999)
+
+
+class SampledTester(Easytest.TestSuite):
+    cacheDir=None
+
+    def busyTest(self):
+        # long enough for the coarse CPU timer to take several samples.
+        start=time.process_time()
+        while time.process_time() - start < 0.2:
+            fibonacci(15)
+
+
+class SnapshotTester(Easytest.TestSuite):
+    userName="Bob"
+
+    def reportTest(self):
+        report={"users": [{"name": self.userName, "roles": ("admin",)}, {"name": "Eve", "roles": ()}], "total": 2}
+        self.expect(report).toMatchSnapshot()
+
+    def severalSnapshotsTest(self):
+        self.expect([1, 2, 3]).toMatchSnapshot()
+        self.expect({"b": 1, "a": {2, 1}}).toMatchSnapshot()
+        self.expect(None).toMatchSnapshot("nothing")
+
+
+fixtureLog=[]
+mainProcess=os.getpid()
+
+class FixtureTester(Easytest.TestSuite):
+    cacheDir=None
+
+    def beforeAll(self):
+        fixtureLog.append("beforeAll")
+
+    def afterAll(self):
+        fixtureLog.append("afterAll")
+
+    @Easytest.fixture()
+    def numbers(self):
+        fixtureLog.append("build numbers")
+        yield [1, 2, 3]
+        fixtureLog.append("teardown numbers")
+
+    @Easytest.fixture(scope="process")
+    def processId(self):
+        return os.getpid()
+
+    @Easytest.fixture(scope="session")
+    def sessionProcessId(self):
+        return os.getpid()
+
+    def firstNumbersTest(self):
+        self.expect(self.numbers).toEqual([1, 2, 3])
+
+    def secondNumbersTest(self):
+        self.expect(self.numbers).toHaveLength(3)
+
+    def processScopeTest(self):
+        self.expect(self.processId).toEqual(os.getpid())
+
+    def sessionScopeTest(self):
+        # built in the main process, also when the test runs in a worker.
+        self.expect(self.sessionProcessId).toEqual(mainProcess)
+
+
+class BrokenSetupTester(Easytest.TestSuite):
+    cacheDir=None
+
+    def beforeAll(self):
+        raise RuntimeError("no database")
+
+    def afterAll(self):
+        fixtureLog.append("afterAll of broken setup")
+
+    def firstTest(self):
+        pass
+
+    def secondTest(self):
+        pass
+
+
+class CountingRepr:
+    """Counts how many times it is displayed."""
+    displayed = 0
+
+    def __repr__(self):
+        CountingRepr.displayed += 1
+        return "CountingRepr()"
+
+class IntEqual:
+    """Compares like numpy scalars, returning a truthy value that is not a bool."""
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return int(self.value == other)
+
+
+class RecordingReporter(Reporter):
+    def __init__(self):
+        self.events = []
+        self.errors = {}
+        self.expectations = {}
+
+    def onSuiteStart(self, suite):
+        self.events.append(("suiteStart",))
+
+    def onTestStart(self, name):
+        self.events.append(("start", name))
+
+    def onTestPass(self, name):
+        self.events.append(("pass", name))
+
+    def onTestFail(self, name):
+        self.events.append(("fail", name))
+
+    def onTestResult(self, result, description, expectations, errors):
+        self.errors[result.name] = list(errors)
+        self.expectations[result.name] = list(expectations)
+
+    def onFailureReport(self, name, description, expectations, errors):
+        self.events.append(("report", name, description, len(expectations), len(errors)))
+
+    def onSummary(self, suite):
+        self.events.append(("summary",))
+
+
+def runSuite(suite, **kwargs):
+    """Runs a suite without letting its sys.exit stop the assertions below."""
+    try:
+        suite.run(**kwargs)
+    except SystemExit:
+        pass
+    return suite
+
 
 if __name__ == "__main__":
     # exit_gracefully=True in order to test the error logging output without non-zero exit code
     tester=Tester(exit_gracefully=True) 
-    tester.run()
+    runSuite(tester)
     
     assert tester._status["passTest"] == "passed"
     assert tester._status["passEmptyTest"] == "passed"
@@ -180,6 +534,10 @@ if __name__ == "__main__":
     assert tester._status["failSubset3Test"] == "failed"
     assert tester._status["failSubset4Test"] == "failed"
     assert tester._status["failSubset5Test"] == "failed"
+    assert tester._status["passSubsetCollectionsTest"] == "passed"
+    assert tester._status["failSubsetSetTest"] == "failed"
+    assert tester._status["passCompiledSubsetTest"] == "passed"
+    assert tester._status["failCompiledSubsetTest"] == "failed"
     assert tester._status["passInstanceOfTest"] == "passed"
     assert tester._status["failInstanceOfTest"] == "failed"
     assert tester._status["passGreaterThanTest"] == "passed"
@@ -201,6 +559,663 @@ if __name__ == "__main__":
     assert tester._status["failThrowWithTest"] == "failed"
     assert tester._status["passCloseToTest"] == "passed"
     assert tester._status["failCloseToTest"] == "failed"
+    assert tester._status["passAsyncTest"] == "passed"
+    assert tester._status["passEachTest"] == "passed"
+    assert tester._status["failEachTest"] == "failed"
+    assert tester._status["failAsyncTest"] == "failed"
     # assert tester._status["passInstanceOf"] == "passed"
+    summary=tester.summary()
+    assert summary.total == len(tester._status)
+    assert summary.failed == list(tester._status.values()).count("failed")
+    assert sorted(summary.failedNames) == sorted(name for name, result in tester._status.items() if result == "failed")
+    # passing tests never allocate message storage, and reported failures drop theirs.
+    assert tester._messageHandler.contexts["passEmptyTest"] is None
+    assert not tester._messageHandler.failed
+    messageHandler=_MessageHandler()
+    for n in range(100000):
+        messageHandler.setContext(n)
+        messageHandler.queueError(ValueError(n))
+    start=time.perf_counter()
+    messageHandler.popAll(QuietReporter())
+    assert time.perf_counter() - start < 0.5 # linear, removing each failure from a list took seconds
+    assert not messageHandler.failed
+
+    parallelTester=runSuite(Tester(exit_gracefully=True), workers=2)
+    assert tester._status["passTest"].testTime >= 10**9
+    assert tester._status["passTest"].duration >= tester._status["passTest"].testTime
+    assert tester._status["passEmptyTest"].testTime < 10**9
+
+    assert sorted(parallelTester._status.items()) == sorted(tester._status.items())
+
+    asyncTester=runSuite(AsyncTester(exit_gracefully=True))
+    assert asyncTester._status["firstSlowTest"] == "passed"
+    assert asyncTester._status["secondSlowTest"] == "failed"
+    assert asyncTester._status["thirdSlowTest"] == "passed"
+    assert asyncTester._run_time < 1.0 # ran concurrently
+
+    output=io.StringIO()
+    with redirect_stdout(output):
+        capturedTester=runSuite(Tester(exit_gracefully=True))
+    assert "RUNS" not in output.getvalue() # not a terminal
+    assert output.getvalue().count(" PASS ") == list(capturedTester._status.values()).count("passed")
+    assert output.getvalue().count(" FAIL ") == list(capturedTester._status.values()).count("failed")
+
+    output=io.StringIO()
+    with redirect_stdout(output):
+        quietTester=runSuite(Tester(exit_gracefully=True, reporter=QuietReporter()))
+    assert output.getvalue() == ""
+    assert quietTester._status == tester._status
+
+    reporter=RecordingReporter()
+    runSuite(AsyncTester(exit_gracefully=True, reporter=reporter))
+    assert reporter.events[0] == ("suiteStart",)
+    assert reporter.events[-1] == ("summary",)
+    assert ("report", "secondSlowTest", "Should keep its own context while other tests run", 0, 1) in reporter.events
+    assert reporter.events.index(("start", "firstSlowTest")) < reporter.events.index(("pass", "firstSlowTest"))
+
+    assert firstMismatch({"items":[{"id":1}]*3 + [{"id":"4"}]}, {"items":[{"id":int}]*5}) == "$.items[3].id"
+    assert firstMismatch({"a b":{2:[1,2,3]}}, {"a b":{2:[1,2]}}) == "$['a b'][2][2]"
+    assert firstMismatch({"missing":1}, {}) == "$.missing"
+    assert firstMismatch([1,"2"], [int]) == "$[1]"
+    assert firstMismatch({"a":[1,2]}, {"a":[1,2,3]}) is None
+    assert firstMismatch({"a":IntEqual(3)}, {"a":3}) is None
+    assert firstMismatch({"a":[IntEqual(3)]}, {"a":[4]}) == "$.a[0]"
+    Expect({"a":IntEqual(3)}).toBeSubset({"a":3})
+    assert Easytest.compileSubset({"a":3}).matches({"a":IntEqual(3)})
+
+    template={"items":[{"id":int, "name":str}] * 3, "total":(int, float)[0], "flags":{"a", "b"}}
+    matcher=Easytest.compileSubset(template)
+    records=[
+        {"items":[{"id":1}], "total":3},
+        {"items":[{"id":1}, {"id":"2"}]},
+        {"items":[{}, {}, {}, {}]},
+        {"flags":{"a"}},
+        {"flags":{"c"}},
+        {"total":2.5},
+        ["not", "a", "dict"],
+    ]
+    assert matcher.failingIndices(iter(records)) == [1, 2, 4, 5, 6]
+    for record in records:
+        assert matcher.firstMismatch(record) == firstMismatch(record, template)
+    assert matcher.firstMismatch(records[1]) == "$.items[1].id"
+
+    assert shortrepr({"b": [1, "2"], "a": (3,)}) == repr({"b": [1, "2"], "a": (3,)})
+    assert len(shortrepr(list(range(100000)), limit=50)) == 50
+    assert shortrepr(list(range(100000))).endswith("...]")
+    try:
+        Expect(CountingRepr()).toEqual(CountingRepr())
+    except ExpectationFailure as failure:
+        assert CountingRepr.displayed == 0 # not rendered until displayed
+        assert "CountingRepr()" in str(failure)
+        assert CountingRepr.displayed == 2
+    try:
+        Expect(list(range(100000))).toHaveLength(3)
+    except ExpectationFailure as failure:
+        assert str(failure) == "\nExpected object to have length\n\t3\nbut received\n\t100000"
+
+    if numpy is not None:
+        output=io.StringIO()
+        with redirect_stdout(output):
+            arrayTester=runSuite(ArrayTester(exit_gracefully=True))
+        assert arrayTester._status == {"failArrayCloseTest": "failed", "failArrayEqualTest": "failed",
+            "failShapeTest": "failed", "passArrayCloseTest": "passed", "passArrayEqualTest": "passed"}
+        assert "3 of 1000000 elements differ, first at indices [(3,), (500,), (999999,)]" in output.getvalue()
+        assert "array of shape (1000, 1000) instead of (1000000,)" in output.getvalue()
+        assert len(output.getvalue()) < 5000 # arrays are summarized
+
+    try:
+        Expect.each(["a1", "b", "c3", "d"]).toMatch(r"\d")
+    except ExpectationFailure as failure:
+        assert "2 of 4 items failed, e.g. [1]: 'b', [3]: 'd'" in str(failure)
+
+    assert Expect(lambda: sum(range(10))).toRunFasterThan(10)
+    sleep=lambda: time.sleep(0.002)
+    try:
+        Expect(sleep).toRunFasterThan(1, warmup=0, repeat=3)
+        assert False, "sleeping 2 ms should not run faster than 1 ms"
+    except ExpectationFailure as failure:
+        assert failure.received.median >= 2 * 10**6 and failure.received.runs == 3
+        assert "median" in str(failure) and "p95" in str(failure) and "stddev" in str(failure)
+    with tempfile.TemporaryDirectory() as cacheDir:
+        messageHandler=_MessageHandler()
+        messageHandler.cacheDir=cacheDir
+        assert Expect(sleep, messageHandler).toNotRegressAgainst("sleep", repeat=5) # the first run saves the baseline
+        assert Benchmark.loadBaseline(cacheDir, "sleep").runs == 5
+        Benchmark.saveBaseline(cacheDir, "sleep", Benchmark.Timing(10**6, 10**6, 0, 5))
+        try:
+            Expect(sleep, messageHandler).toNotRegressAgainst("sleep", repeat=5)
+            assert False, "sleeping 2 ms should regress against a 1 ms baseline"
+        except ExpectationFailure as failure:
+            assert "to be at most 10% slower than baseline 'sleep'" in str(failure)
+            assert "median 1.00 ms" in str(failure)
+        # in a suite the baselines are kept in its cacheDir, and not at all without one.
+        baselineTester=BaselineTester(reporter=QuietReporter())
+        baselineTester.cacheDir=os.path.join(cacheDir, "suite")
+        assert runSuite(baselineTester).summary().passed == 1
+        assert Benchmark.loadBaseline(baselineTester.cacheDir, "baseline sum").runs == 3
+        baselineTester=BaselineTester(reporter=QuietReporter())
+        baselineTester.cacheDir=None
+        emptyDirectory=os.path.join(cacheDir, "empty")
+        os.mkdir(emptyDirectory)
+        workingDirectory=os.getcwd()
+        os.chdir(emptyDirectory) # where the default cacheDir would be
+        try:
+            assert runSuite(baselineTester).summary().passed == 1
+        finally:
+            os.chdir(workingDirectory)
+        assert os.listdir(emptyDirectory) == []
+
+    assert Expect(lambda: [0]*100).toAllocateLessThan(10**4)
+    try:
+        Expect(lambda: bytearray(10**6)).toAllocateLessThan(10**5)
+        assert False, "a megabyte is not less than 100 kB"
+    except ExpectationFailure as failure:
+        assert failure.received.peak >= 10**6 and failure.received.net < 10**5
+        assert "to allocate less than (bytes at peak)" in str(failure) and "peak 1.0 MB" in str(failure)
+    assert Expect(lambda: bytearray(10**6)).Not.toAllocateLessThan(10**5)
+
+    for workers in (None, 2):
+        memoryTester=runSuite(MemoryTester(reporter=QuietReporter()), workers=workers, trace_memory=True)
+        memory={name: result.memory for name, result in memoryTester._status.items()}
+        assert memoryTester.summary().passed == 4
+        assert memory["keepMegabyteTest"].peak >= 10**6 and memory["keepMegabyteTest"].net >= 10**6
+        assert os.path.abspath(memory["keepMegabyteTest"].sites[0][0].rsplit(":", 1)[0]) == os.path.abspath(__file__)
+        assert memory["dropMegabyteTest"].peak >= 10**6 and memory["dropMegabyteTest"].net < 10**5
+        assert memory["smallTest"].peak < 10**5
+        assert memory["nestedTest"].net >= 8*10**5 # includes what the expectation measured
+    assert not tracemalloc.is_tracing()
+    assert runSuite(MemoryTester(reporter=QuietReporter()))._status["smallTest"].memory is None
+
+    with tempfile.TemporaryDirectory() as directory:
+        SnapshotTester.cacheDir=os.path.join(directory, "cache")
+        SnapshotTester.snapshotDir=os.path.join(directory, "snapshots")
+        snapshotPath=os.path.join(directory, "snapshots", "Easytest.test.SnapshotTester.snap")
+        snapshotTester=runSuite(SnapshotTester(reporter=QuietReporter()), workers=2)
+        assert snapshotTester.summary().passed == 2 and snapshotTester._snapshots.added == 4
+        with open(snapshotPath) as file:
+            headers=[line.rsplit(" ", 2)[0] for line in file if line.startswith("## ")]
+        assert sorted(headers) == ["## reportTest 1", "## severalSnapshotsTest 1", "## severalSnapshotsTest 2",
+                                   "## severalSnapshotsTest nothing"]
+        snapshotTester=runSuite(SnapshotTester(reporter=QuietReporter()))
+        assert snapshotTester.summary().passed == 2
+        assert snapshotTester._snapshots.reads == 0 # matched by their hashes
+        assert snapshotTester._snapshots.added == 0
+        os.remove(os.path.join(SnapshotTester.cacheDir, "snapshots", "Easytest.test.SnapshotTester.json"))
+        assert runSuite(SnapshotTester(reporter=QuietReporter())).summary().passed == 2 # the index is rebuilt
+
+        SnapshotTester.userName="Rob"
+        with open(snapshotPath) as file:
+            stored=file.read()
+        snapshotTester=runSuite(SnapshotTester(exit_gracefully=True, reporter=RecordingReporter()))
+        assert snapshotTester.summary().failedNames == ["reportTest"]
+        expected, diff, phrase=snapshotTester.reporter.expectations["reportTest"][0]
+        assert "to match snapshot 'reportTest 1'" in phrase
+        assert expected["users"][0]["name"] == "Bob"
+        assert repr(diff) == "1 difference: ['users'][0]['name']: 'Rob' instead of 'Bob'"
+        with open(snapshotPath) as file:
+            assert file.read() == stored # not replaced without update_snapshots
+        snapshotTester=runSuite(SnapshotTester(reporter=QuietReporter()), update_snapshots=True)
+        assert snapshotTester.summary().passed == 2 and snapshotTester._snapshots.updated == 1
+        with open(snapshotPath) as file:
+            updated=file.read()
+        assert "Rob" in updated and "Bob" not in updated
+        keys=lambda text: [line.rsplit(" ", 2)[0] for line in text.splitlines() if line.startswith("## ")]
+        assert keys(updated) == keys(stored) # replaced in place
+        assert runSuite(SnapshotTester(reporter=QuietReporter())).summary().passed == 2
+        SnapshotTester.userName="Bob"
+
+    with tempfile.TemporaryDirectory() as profileDir:
+        ProfiledTester.profileDir=profileDir
+        for workers in (None, 2):
+            profiledTester=runSuite(ProfiledTester(reporter=QuietReporter()), workers=workers, profile=True)
+            hotspots=profiledTester._status["fibonacciTest"].profile
+            assert hotspots[0].function.startswith("fibonacci (Easytest.test.py:") and hotspots[0].calls == 57313
+            # sorting takes most of the test, but the exact rank depends on timing.
+            assert any("sorted" in hotspot.function for hotspot in profiledTester._status["sortTest"].profile[:3])
+            functions=[hotspot.function for hotspot in profiledTester._profile.hotspots(limit=None)]
+            assert not [function for function in functions if "Easytest.py" in function or "ColorPrint" in function]
+            assert profiledTester._profilePath == os.path.join(profileDir, "Easytest.test.ProfiledTester.pstats")
+            written=pstats.Stats(profiledTester._profilePath).stats
+            profiled={function for _, _, function in written}
+            assert "fibonacci" in profiled and "prepare" not in profiled
+            # only what the tests called, for other tools the tests are the roots.
+            assert not profiled & {"_profiled", "_runToCompletion", "stop", "__exit__", "iscoroutine"}
+            assert [function for function, (*_, callers) in written.items() if not callers] == \
+                   [function for function in written if function[2] in ("fibonacciTest", "sortTest")]
+        SampledTester.profileDir=profileDir
+        sampledTester=runSuite(SampledTester(reporter=QuietReporter()), profile="sample")
+        hotspots=sampledTester._status["busyTest"].profile
+        assert hotspots[0].function.startswith("fibonacci (Easytest.test.py:") and hotspots[0].calls is None
+        with open(sampledTester._profilePath) as file:
+            stacks=file.read().splitlines()
+        assert sampledTester._profilePath.endswith(".folded") and stacks
+        # stacks start at the test, without the frames of the test runner.
+        assert all(stack.startswith("busyTest;busyTest (Easytest.test.py:") for stack in stacks), stacks
+    try:
+        ProfiledTester(reporter=QuietReporter()).run(profile="perf")
+        assert False, "perf is not a profiler"
+    except ValueError as error:
+        assert "profile must be one of" in str(error)
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+        historyTester=AsyncTester(exit_gracefully=True, reporter=QuietReporter())
+        historyTester.cacheDir=cacheDir
+        historyTester.historyLength=2
+        for _ in range(3):
+            runSuite(historyTester)
+        history=Easytest.Cache(cacheDir).get("durations/Easytest.test.AsyncTester")
+        assert sorted(history) == ["firstSlowTest", "secondSlowTest", "thirdSlowTest"]
+        assert len(history["firstSlowTest"]) == 2
+        assert historyTester._timingHistory["firstSlowTest"][0] >= 5 * 10**8
+
+    history={"a": [90, 100, 110], "b": [50], "c": [40], "d": [30], "e": [20, 20]}
+    names=["a", "b", "c", "d", "e", "new"] # "new" has no history, expected to take 40 (the median)
+    assert Scheduler.longestFirst(names, history) == ["a", "b", "c", "new", "d", "e"]
+    assert Scheduler.longestFirst(names, history, {"e", "c"}) == ["c", "e", "a", "b", "new", "d"]
+    assert Scheduler.partition(names, history, 2) == [["a", "d", "e"], ["b", "c", "new"]]
+    assert Scheduler.partition(names, {}, 3) == [["a", "d"], ["b", "e"], ["c", "new"]]
+    assert Scheduler.chunks(["a", "b", "c", "new", "d", "e"], history, 1) == [["a"], ["b"], ["c"], ["new"], ["d"], ["e"]]
+    assert Scheduler.chunks(list("abcdefghij"), {}, 1) == [["a", "b"], ["c", "d"], ["e"], ["f"], ["g"], ["h"], ["i"], ["j"]]
+
+    class ChunkedTester(Easytest.TestSuite):
+        """A few long tests, which sort first, and many short ones."""
+        @Easytest.parametrize([0.2] * 8)
+        def aSlowTest(self, seconds):
+            time.sleep(seconds)
+
+        @Easytest.parametrize([0.003] * 92)
+        def fastTest(self, seconds):
+            time.sleep(seconds)
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+        times=[]
+        for _ in range(2): # without history, then with it
+            chunkedTester=ChunkedTester(reporter=QuietReporter())
+            chunkedTester.cacheDir=cacheDir
+            start=time.perf_counter()
+            runSuite(chunkedTester, workers=2)
+            times.append(time.perf_counter() - start)
+        # without history the long tests share the first chunk and one worker runs them all.
+        assert times[1] < 0.75 * times[0], times
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+        historyTester=Tester(exit_gracefully=True, reporter=QuietReporter())
+        historyTester.cacheDir=cacheDir
+        runSuite(historyTester)
+        history=Easytest.Cache(cacheDir).get("durations/Easytest.test.Tester")
+        shardedStatus=dict()
+        for shard in range(3):
+            shardTester=Tester(exit_gracefully=True, reporter=QuietReporter())
+            shardTester.cacheDir=cacheDir
+            runSuite(shardTester, shard=shard, total=3)
+            assert not set(shardTester._status) & set(shardedStatus)
+            shardedStatus.update(shardTester._status)
+        assert sorted(shardedStatus.items()) == sorted(tester._status.items())
+        assert Easytest.Cache(cacheDir).get("durations/Easytest.test.Tester") == history
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("a", "b"):
+            with open(os.path.join(directory, "dependency_{}.py".format(name)), "w") as file:
+                file.write("def value():\n    return {!r}\n".format(name))
+        sys.path.insert(0, directory)
+        dependentTester=DependentTester(exit_gracefully=True, reporter=QuietReporter())
+        dependentTester.cacheDir=os.path.join(directory, "cache")
+        runSuite(dependentTester, incremental=True)
+        assert len(dependentTester._status) == 3 and dependentTester._skipped == []
+        assert os.path.join(directory, "dependency_b.py") in dependentTester._status["usesBTest"].dependencies
+        assert os.path.join(directory, "dependency_a.py") not in dependentTester._status["usesBTest"].dependencies
+
+        dependentTester._status.clear()
+        runSuite(dependentTester, incremental=True)
+        assert list(dependentTester._status) == ["failUsesNothingTest"] # failed last time
+        assert dependentTester._skipped == ["usesATest", "usesBTest"]
+
+        with open(os.path.join(directory, "dependency_b.py"), "a") as file:
+            file.write("# changed\n")
+        dependentTester._status.clear()
+        runSuite(dependentTester, incremental=True, workers=2)
+        assert sorted(dependentTester._status) == ["failUsesNothingTest", "usesBTest"]
+        assert dependentTester._skipped == ["usesATest"]
+        sys.path.remove(directory)
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+        failingTests=[name for name, result in tester._status.items() if result == "failed"]
+        for kwargs in ({}, {"workers": 2}):
+            fastTester=Tester(exit_gracefully=True, reporter=RecordingReporter())
+            fastTester.cacheDir=cacheDir
+            runSuite(fastTester, fail_fast=True, **kwargs)
+            assert [event[0] for event in fastTester.reporter.events].count("fail") == 1
+            assert fastTester.summary().failed == 1
+            assert len(fastTester._notRun) == len(tester._status) - len(fastTester._lastRun)
+            assert fastTester._notRun and fastTester._notRunCause == "fail_fast"
+
+        firstTester=Tester(exit_gracefully=True)
+        firstTester.cacheDir=cacheDir
+        runSuite(firstTester)
+        assert Easytest.Cache(cacheDir).get("failed/Easytest.test.Tester") == sorted(failingTests)
+        firstTester=Tester(exit_gracefully=True)
+        firstTester.cacheDir=cacheDir
+        runSuite(firstTester, fail_fast=3, failed_first=True)
+        assert [result.name for result in firstTester._lastRun] == failingTests[:3]
+        # parallel and coroutine tests are scheduled longest first, but after the failed ones.
+        scheduled=[test.__name__ for test in firstTester._longestFirst(firstTester._tests)]
+        assert sorted(scheduled[:len(failingTests)]) == sorted(failingTests)
+        # tests that did not run keep their failed status for the next run.
+        assert Easytest.Cache(cacheDir).get("failed/Easytest.test.Tester") == sorted(failingTests)
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "nested"))
+        suiteSource=(
+            "from Easytest import TestSuite\n"
+            "class {0}(TestSuite):\n"
+            "    def passTest(self):\n"
+            "        self.expect(1).toEqual({1})\n")
+        with open(os.path.join(directory, "passing.test.py"), "w") as file:
+            file.write(suiteSource.format("PassingTester", 1))
+        with open(os.path.join(directory, "nested", "failing.test.py"), "w") as file:
+            file.write(suiteSource.format("FailingTester", 2))
+        with open(os.path.join(directory, "helper.py"), "w") as file:
+            file.write("raise Exception('not a test file')\n")
+        files=list(findTestFiles([directory]))
+        assert [os.path.basename(path) for path in files] == ["passing.test.py", "failing.test.py"]
+
+        cacheDir=os.path.join(directory, "cache")
+        discovery=Discovery(cacheDir)
+        assert [name for _, name in discovery.discover(files)] == ["PassingTester", "FailingTester"]
+        assert discovery.imported == 2
+        discovery=Discovery(cacheDir)
+        assert [name for _, name in discovery.discover(files)] == ["PassingTester", "FailingTester"]
+        assert discovery.imported == 0 # unchanged files are not imported again
+
+        workingDirectory=os.getcwd()
+        os.chdir(directory)
+        try:
+            for argv in ([], ["--workers", "2"]):
+                with redirect_stdout(io.StringIO()) as output:
+                    assert Easytest.main(argv) == 1
+                assert "1 of 2 suites failed" in output.getvalue()
+                assert "Ran 2 suites" in output.getvalue()
+            with redirect_stdout(io.StringIO()):
+                assert Easytest.main(["passing.test.py"]) == 0
+            # a file that can't be imported, or a suite that raises, fails on its own.
+            with open("broken.test.py", "w") as file:
+                file.write("def brokenTest(self)\n")
+            with open("raising.test.py", "w") as file:
+                file.write(suiteSource.format("RaisingTester", 1) +
+                           "    def beforeEach(self):\n        raise ValueError('no setup')\n")
+            for argv in ([], ["--workers", "2"]):
+                with redirect_stdout(io.StringIO()) as output:
+                    assert Easytest.main(argv) == 1
+                assert "SyntaxError" in output.getvalue() and "ValueError: no setup" in output.getvalue()
+                assert "2 of 3 suites failed" in output.getvalue()
+                assert "1 test file could not be imported" in output.getvalue()
+            assert [name for _, name in Discovery(cacheDir).discover(["broken.test.py", "passing.test.py"])] == \
+                   ["PassingTester"]
+        finally:
+            os.chdir(workingDirectory)
+
+    with tempfile.TemporaryDirectory() as directory:
+        def write(name, source):
+            path=os.path.join(directory, name)
+            modified=os.stat(path).st_mtime_ns + 10**9 if os.path.exists(path) else None
+            with open(path, "w") as file:
+                file.write(source)
+            if modified is not None: # a change within the resolution of the file system is still seen
+                os.utime(path, ns=(modified, modified))
+        geometrySource=(
+            "from Easytest import TestSuite\n"
+            "from shapes import area\n"
+            "import unrelated\n"
+            "class GeometryTester(TestSuite):\n"
+            "    def areaTest(self):\n"
+            "        self.expect(area(2, 3)).toEqual(6)\n"
+            "    def constantTest(self):\n"
+            "        self.expect({}).toEqual(4)\n")
+        write("shapes.py", "def area(width, height):\n    return width * height\n")
+        write("unrelated.py", "def nothing():\n    return None\n")
+        write("geometry.test.py", geometrySource.format("2 + 2"))
+        suite=("geometry.test.py", "GeometryTester")
+        workingDirectory=os.getcwd()
+        os.chdir(directory)
+        try:
+            watch=Watch(["."])
+            with redirect_stdout(io.StringIO()):
+                assert watch.rerun() == {suite: None}
+                assert watch.poll() == set()
+                write("shapes.py", "def area(width, height):\n    return width * height # in square units\n")
+                geometryModule=sys.modules["geometry.test"]
+                assert watch.rerun(watch.poll()) == {suite: {"areaTest"}}
+                assert sys.modules["geometry.test"] is not geometryModule # it imported area from shapes
+                write("geometry.test.py", geometrySource.format("3 + 1"))
+                assert watch.rerun(watch.poll()) == {suite: {"constantTest"}}
+                write("shapes.py", "def area(width, height):\n    return width + height\n")
+                assert watch.rerun(watch.poll()) == {suite: {"areaTest"}}
+                assert Easytest.Cache(".easytest_cache").get("failed/geometry.test.GeometryTester") == ["areaTest"]
+                write("unrelated.py", "def nothing():\n    return 0\n")
+                assert watch.rerun(watch.poll()) == {suite: {"areaTest"}} # only the failed test
+                write("geometry.test.py", "FOUR=4\n" + geometrySource.format("FOUR"))
+                assert watch.rerun(watch.poll()) == {suite: None} # not just a test method changed
+                write("shapes.py", "def area(width, height):\n    return width *\n")
+                assert watch.rerun(watch.poll()) == {} # the syntax error is displayed
+                write("shapes.py", "def area(width, height):\n    return width * height\n")
+                assert watch.rerun(watch.poll()) == {suite: {"areaTest"}}
+            assert Easytest.Cache(".easytest_cache").get("failed/geometry.test.GeometryTester") == []
+            assert not watch._isProjectModule("__main__", sys.modules["__main__"]) and "__main__" in sys.modules
+        finally:
+            os.chdir(workingDirectory)
+            sys.path.remove(directory)
+            for name in ("geometry.test", "shapes", "unrelated"):
+                sys.modules.pop(name, None)
+
+    # importing Easytest and running a passing suite must not load what only other runs need.
+    importBenchmark=subprocess.run([sys.executable, "-c",
+        "import sys, time\n"
+        "start=time.perf_counter()\n"
+        "import Easytest\n"
+        "print(round((time.perf_counter()-start)*1000, 1))\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+        "from easytest.Reporter import QuietReporter\n"
+        "class PassingTester(Easytest.TestSuite):\n"
+        "    cacheDir=None\n"
+        "    def passTest(self):\n"
+        "        self.expect([1,2]).toEqual([1,2])\n"
+        "PassingTester(reporter=QuietReporter()).run()\n"
+        "print(' '.join(sorted(sys.modules)))\n"],
+        cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    importTime, importedModules, runModules=importBenchmark.stdout.splitlines()
+    print("import Easytest took {} ms".format(importTime))
+    lazyModules={"asyncio", "multiprocessing", "traceback", "statistics", "pickle", "easytest.Scheduler",
+        "easytest.Dependencies", "easytest.Discovery", "easytest.Memory", "tracemalloc", "easytest.Profiling", "cProfile"}
+    # only loaded once the tests use them, e.g. to compare or display values.
+    usedModules={"re", "json", "threading", "easytest.helpers"}
+    assert not (lazyModules | usedModules) & set(importedModules.split()), \
+        (lazyModules | usedModules) & set(importedModules.split())
+    assert not lazyModules & set(runModules.split()), lazyModules & set(runModules.split())
+
+    with tempfile.TemporaryDirectory() as directory:
+        jsonPath=os.path.join(directory, "results.jsonl")
+        xmlPath=os.path.join(directory, "results.xml")
+        recordedTester=Tester(exit_gracefully=True, reporter=CombinedReporter(
+            RecordingReporter(), JsonLinesReporter(jsonPath), JUnitXmlReporter(xmlPath)))
+        runSuite(recordedTester, workers=2)
+        assert ("fail", "failTest") in recordedTester.reporter.reporters[0].events
+        with open(jsonPath) as file:
+            records={record["name"]: record for record in map(json.loads, file)}
+        assert set(records) == set(recordedTester._status)
+        assert records["passTest"]["status"] == "passed" and records["passTest"]["duration"] >= 1
+        assert records["failTest"]["description"] == "Should print error"
+        assert records["failTest"]["errors"][0]["type"] == "ZeroDivisionError"
+        assert records["failTest"]["errors"][0]["traceback"]
+        assert records["failNotToEqualTest"]["expectations"][0]["received"] == "'Epic string'"
+        testsuite=ElementTree.parse(xmlPath).getroot().find("testsuite")
+        assert testsuite.get("name") == "Easytest.test.Tester"
+        assert int(testsuite.get("tests")) == len(recordedTester._status)
+        assert int(testsuite.get("failures")) + int(testsuite.get("errors")) == recordedTester.summary().failed
+        testcases={testcase.get("name"): testcase for testcase in testsuite.iter("testcase")}
+        assert testcases["failTest"].find("error").get("type") == "ZeroDivisionError"
+        assert testcases["failNotToEqualTest"].find("failure") is not None
+        assert len(testcases["passTest"]) == 0
+        assert not os.path.exists(xmlPath + ".partial")
+        # tests that didn't run are skipped test cases, counted in the total.
+        stoppedTester=Tester(exit_gracefully=True, reporter=JUnitXmlReporter(xmlPath))
+        stoppedTester.cacheDir=None
+        runSuite(stoppedTester, fail_fast=True)
+        testsuite=ElementTree.parse(xmlPath).getroot().find("testsuite")
+        testcases={testcase.get("name"): testcase for testcase in testsuite.iter("testcase")}
+        assert int(testsuite.get("tests")) == len(testcases) == len(recordedTester._status)
+        assert int(testsuite.get("skipped")) == len(stoppedTester._notRun) > 0
+        assert all(testcases[name].find("skipped").get("message") == "not run after too many failures"
+                   for name in stoppedTester._notRun)
+
+    class LazyCaseTester(Easytest.TestSuite):
+        cacheDir=None
+        @Easytest.parametrize(squareCases)
+        def notAheadTest(self, n, square):
+            # the cases are generated one at a time as the tests run.
+            self.expect(len(generatedCases)).toEqual(n + 1)
+    generatedCases.clear()
+    lazyTester=runSuite(LazyCaseTester(reporter=QuietReporter()))
+    assert lazyTester.summary().passed == 1000 and not lazyTester.summary().failed
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+        ParametrizedTester.cacheDir=cacheDir
+        parametrizedTester=runSuite(ParametrizedTester(exit_gracefully=True, reporter=QuietReporter()))
+        assert len(parametrizedTester._status) == 3 + 1000 + 2 + 2
+        assert parametrizedTester.summary().failedNames == ["addTest[2]"]
+        assert parametrizedTester._status["squareTest[999]"] == "passed"
+        assert parametrizedTester._status["sleepTest[1]"].testTime >= 0.02 * 10**9
+        parallelTester=runSuite(ParametrizedTester(exit_gracefully=True, reporter=QuietReporter()), workers=2)
+        assert parallelTester._status == parametrizedTester._status
+        shardNames=set()
+        for shard in range(2):
+            shardTester=ParametrizedTester(exit_gracefully=True, reporter=QuietReporter())
+            shardTester.cacheDir=None # both shards must be computed from the same (no) history
+            runSuite(shardTester, shard=shard, total=2)
+            assert not shardNames & set(shardTester._status)
+            shardNames|=set(shardTester._status)
+        assert shardNames == set(parametrizedTester._status)
+
+    fixtureTester=runSuite(FixtureTester(reporter=QuietReporter()))
+    assert fixtureTester.summary().passed == 4
+    assert fixtureLog == ["beforeAll", "build numbers", "afterAll", "teardown numbers"]
+    fixtureLog.clear()
+    parallelFixtureTester=runSuite(FixtureTester(reporter=QuietReporter()), workers=2)
+    assert parallelFixtureTester.summary().passed == 4
+    assert fixtureLog == ["beforeAll", "afterAll"] # the workers build and tear down their own numbers
+
+    brokenTester=runSuite(BrokenSetupTester(exit_gracefully=True, reporter=RecordingReporter()))
+    assert brokenTester.summary().failedNames == ["beforeAll"]
+    assert brokenTester._notRun == ["firstTest", "secondTest"] and brokenTester._notRunCause == "beforeAll"
+    assert brokenTester.reporter.errors["beforeAll"][0][0] == "RuntimeError"
+    assert "afterAll of broken setup" not in fixtureLog
+    with tempfile.TemporaryDirectory() as directory:
+        xmlPath=os.path.join(directory, "junit.xml")
+        output=io.StringIO()
+        with redirect_stdout(output):
+            runSuite(BrokenSetupTester(exit_gracefully=True, reporter=CombinedReporter(
+                ColorReporter(), JUnitXmlReporter(xmlPath))))
+        assert "beforeAll failed, 2 tests were not run" in output.getvalue()
+        assert "Stopped after" not in output.getvalue()
+        skipped=ElementTree.parse(xmlPath).getroot().find("testsuite").iter("skipped")
+        assert [element.get("message") for element in skipped] == ["not run because beforeAll failed"] * 2
+
+    with tempfile.TemporaryDirectory() as cacheDir:
+        inputPath=os.path.join(cacheDir, "input.txt")
+        with open(inputPath, "w") as file:
+            file.write("1")
+        class MemoizedTester(Easytest.TestSuite):
+            builds=0
+            @Easytest.fixture(memoize=True, inputs=[inputPath])
+            def table(self):
+                MemoizedTester.builds+=1
+                with open(inputPath) as file:
+                    return {"value": int(file.read())}
+            def tableTest(self):
+                self.expect(self.table).toBeSubset({"value": int})
+        MemoizedTester.cacheDir=cacheDir
+        for _ in range(2):
+            runSuite(MemoizedTester(reporter=QuietReporter()))
+        assert MemoizedTester.builds == 1 # the second run loads the pickled value
+        with open(inputPath, "w") as file:
+            file.write("2")
+        memoizedTester=runSuite(MemoizedTester(reporter=QuietReporter()))
+        assert MemoizedTester.builds == 2 and memoizedTester.table == {"value": 2}
+        assert len(os.listdir(os.path.join(cacheDir, "fixtures"))) == 1 # the outdated value is removed
+        os.remove(inputPath)
+        missingTester=runSuite(MemoizedTester(exit_gracefully=True, reporter=RecordingReporter()))
+        errorType, error, stack = missingTester.reporter.errors["tableTest"][0]
+        assert errorType == "FileNotFoundError" and repr(inputPath) in str(error) and "fixture table" in str(error)
+
+    start=time.perf_counter()
+    timeoutTester=runSuite(TimeoutTester(exit_gracefully=True, reporter=RecordingReporter()))
+    assert time.perf_counter() - start < 3
+    assert timeoutTester.summary().failedNames == ["failSleepTest", "failSwallowTest", "failAsyncSleepTest"]
+    for name in timeoutTester.summary().failedNames:
+        errorType, error, stack = timeoutTester.reporter.errors[name][0]
+        assert errorType == "TimeoutFailure" and error.seconds == 0.2
+        assert "sleep" in "".join(stack) # shows where the test was stuck
+    assert timeoutTester._status["failSleepTest"].testTime < 10**9
+
+    # defined here so that running the project's own tests with easytest doesn't run them serially.
+    class StuckTester(Easytest.TestSuite):
+        """Only run with workers: the stuck test can't be stopped in its own process."""
+        testTimeout = 0.2
+
+        def failStuckTest(self):
+            # with SIGALRM blocked the timeout can't interrupt the test, like in some C code.
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(30)
+
+        def passAfterStuckTest(self):
+            pass
+
+    class BrokenWorkerTester(Easytest.TestSuite):
+        """Only run with workers, where a test that breaks its worker fails on its own."""
+        def beforeEach(self):
+            if self._messageHandler.context == "failSetupTest":
+                raise ValueError("no setup")
+
+        def failSetupTest(self):
+            pass
+
+        def failExitTest(self):
+            os._exit(3)
+
+        def passAfterBrokenTest(self):
+            pass
+
+    discovered={cls.__name__ for cls in suiteClasses(loadModule(__file__))}
+    assert "Tester" in discovered and not {"StuckTester", "BrokenWorkerTester"} & discovered
+
+    if hasattr(signal, "pthread_sigmask"):
+        start=time.perf_counter()
+        stuckTester=runSuite(StuckTester(exit_gracefully=True, reporter=RecordingReporter()), workers=2)
+        assert time.perf_counter() - start < 10
+        assert stuckTester._status["passAfterStuckTest"] == "passed"
+        errorType, error, stack = stuckTester.reporter.errors["failStuckTest"][0]
+        assert errorType == "TimeoutFailure"
+        assert "failStuckTest" in "".join(stack) # dumped by faulthandler before the worker was killed
+
+    brokenTester=runSuite(BrokenWorkerTester(exit_gracefully=True, reporter=RecordingReporter()), workers=2)
+    assert sorted(brokenTester.summary().failedNames) == ["failExitTest", "failSetupTest"]
+    assert brokenTester._status["passAfterBrokenTest"] == "passed"
+    errorType, error, stack = brokenTester.reporter.errors["failSetupTest"][0]
+    assert errorType == "ValueError" and str(error) == "no setup" and "beforeEach" in "".join(stack)
+    errorType, error, stack = brokenTester.reporter.errors["failExitTest"][0]
+    assert errorType == "RuntimeError" and "exit code 3" in str(error)
+
+    target=io.StringIO()
+    stream=BufferedStream(target, size=10, interval=60)
+    stream.write("12345")
+    assert target.getvalue() == ""
+    stream.write("67890")
+    assert target.getvalue() == "1234567890"
+    stream.write("1")
+    stream.flush()
+    assert target.getvalue() == "12345678901"
+
+    serialAsyncTester=runSuite(AsyncTester(exit_gracefully=True), concurrency=1)
+    assert serialAsyncTester._status == asyncTester._status
+    assert serialAsyncTester._run_time >= 1.5
     
     
\ No newline at end of file
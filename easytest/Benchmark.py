@@ -0,0 +1,90 @@
+"""
+Timing of functions for the benchmark expectations of Expect
+(toRunFasterThan and toNotRegressAgainst), and the baselines they
+are compared against.
+"""
+
+import math
+import time
+
+from .Cache import Cache
+
+
+class Timing:
+    """
+    Statistics of the run time of a function, in nanoseconds per call.
+    Displays as e.g. "median 1.20 ms, p95 1.52 ms, stddev 0.08 ms (30 runs)".
+    """
+    __slots__ = ("median", "p95", "stddev", "runs")
+
+    def __init__(self, median, p95, stddev, runs):
+        self.median = median
+        self.p95 = p95
+        self.stddev = stddev
+        self.runs = runs
+
+    @classmethod
+    def fromSamples(cls, samples):
+        from statistics import median, pstdev
+        ordered = sorted(samples)
+        # nearest-rank percentile.
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+        return cls(median(ordered), p95, pstdev(ordered), len(ordered))
+
+    def toDict(self):
+        return {"median": self.median, "p95": self.p95, "stddev": self.stddev, "runs": self.runs}
+
+    @classmethod
+    def fromDict(cls, values):
+        return cls(values["median"], values["p95"], values["stddev"], values["runs"])
+
+    def __repr__(self):
+        return "median {}, p95 {}, stddev {} ({} runs)".format(_formatTime(self.median),
+            _formatTime(self.p95), _formatTime(self.stddev), self.runs)
+
+
+def measure(function, warmup=3, repeat=30, minSampleTime=100000):
+    """
+    Calls `function` `warmup` times, then times `repeat` samples of it with
+    perf_counter_ns. A function faster than `minSampleTime` nanoseconds is
+    called several times per sample, so the timer overhead doesn't dominate.
+    """
+    for _ in range(warmup):
+        function()
+    # calibrate how many calls a sample needs.
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= minSampleTime or number >= 10**6:
+            break
+        number *= 10 if elapsed * 10 < minSampleTime else 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            function()
+        samples.append((time.perf_counter_ns() - start) / number)
+    return Timing.fromSamples(samples)
+
+
+def loadBaseline(cacheDir, name):
+    """The Timing saved as baseline `name` in `cacheDir`, or None if there is none."""
+    if cacheDir is None:
+        return None
+    values = Cache(cacheDir).get("baselines/" + name)
+    return Timing.fromDict(values) if values is not None else None
+
+def saveBaseline(cacheDir, name, timing):
+    """Saves `timing` as baseline `name` in `cacheDir`, unless that is None."""
+    if cacheDir is not None:
+        Cache(cacheDir).set("baselines/" + name, timing.toDict())
+
+
+def _formatTime(nanoseconds):
+    for unit, size in (("s", 10**9), ("ms", 10**6), ("us", 10**3)):
+        if nanoseconds >= size:
+            return "{:.2f} {}".format(nanoseconds / size, unit)
+    return "{:.0f} ns".format(nanoseconds)
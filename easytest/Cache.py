@@ -0,0 +1,32 @@
+import os
+
+class Cache:
+    """
+    Stores JSON values between runs in a directory, by default
+    .easytest_cache in the working directory, one file per key.
+    A missing or unreadable file reads as the default value.
+    """
+    def __init__(self, directory=".easytest_cache"):
+        self.directory = directory
+
+    def _path(self, key):
+        # keys may contain "/" to group values in subdirectories.
+        return os.path.join(self.directory, *key.split("/")) + ".json"
+
+    def get(self, key, default=None):
+        import json
+        try:
+            with open(self._path(key)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return default
+
+    def set(self, key, value):
+        import json
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so an interrupted run can't leave half a file.
+        temporary = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary, "w") as file:
+            json.dump(value, file)
+        os.replace(temporary, path)
@@ -0,0 +1,169 @@
+import _thread
+import sys
+import time
+from contextlib import contextmanager
+
+"""
+Color code guide: https://bixense.com/clicolors/
+and https://en.wikipedia.org/wiki/ANSI_escape_code#8-bit
+
+Modified class from https://stackoverflow.com/a/47622205/9405408
+"""
+
+# Colored printing functions for strings that use universal ANSI escape sequences.
+# fail: bold red, pass: bold green, warn: bold yellow, 
+# info: bold blue, bold: bold white
+
+class BufferedStream:
+    """
+    Wraps a stream and collects everything written to it in memory.
+    The text is passed on in one write when more than `size` characters
+    are pending, or at the latest `interval` seconds after the first
+    pending write, so a long running test does not hide the output.
+    """
+    def __init__(self, stream, size=64 * 1024, interval=0.1):
+        self.stream = stream
+        self.size = size
+        self.interval = interval
+        self._parts = []
+        self._pending = 0
+        # whether a delayed flush is waiting, and the number of flushes so far.
+        self._scheduled = False
+        self._flushes = 0
+        # _thread instead of threading, which imports traceback before Python 3.8.
+        self._lock = _thread.allocate_lock()
+
+    def write(self, text):
+        with self._lock:
+            self._parts.append(text)
+            self._pending += len(text)
+            full = self._pending >= self.size
+            if not full and not self._scheduled:
+                self._scheduled = True
+                _thread.start_new_thread(self._flushLater, (self._flushes,))
+        if full:
+            self.flush()
+        return len(text)
+
+    def _flushLater(self, flushes):
+        time.sleep(self.interval)
+        if self._flushes == flushes: # else it was flushed in the meantime
+            self.flush()
+
+    def flush(self):
+        # writes while holding the lock so concurrent flushes keep the order.
+        with self._lock:
+            text = "".join(self._parts)
+            self._parts = []
+            self._pending = 0
+            self._scheduled = False
+            self._flushes += 1
+            if text:
+                self.stream.write(text)
+            self.stream.flush()
+
+    def isatty(self):
+        return self.stream.isatty()
+
+    def __getattr__(self, name):
+        # behave like the wrapped stream for everything else (encoding, fileno, ...)
+        return getattr(self.stream, name)
+
+
+class ColorPrint:
+    @staticmethod
+    def print(message, foreground=231, background=False, end = '\n'):
+        """
+        For color codes: https://en.wikipedia.org/wiki/ANSI_escape_code#8-bit
+        """
+        prepend=''
+        if background not in range(0,256): raise IndexError("Background must be between 0-255")
+        elif background:
+            prepend='\x1b[48;5;{}m'.format(background)
+        ansi_code = '{}\x1b[38;5;{}m'.format(prepend, foreground)
+        sys.stdout.write(ansi_code + message + '\x1b[0m' + end)
+
+    @staticmethod
+    def isatty():
+        """Whether stdout is a terminal, that is, if transient lines can be overwritten."""
+        isatty = getattr(sys.stdout, "isatty", None)
+        return bool(isatty and isatty())
+
+    @staticmethod
+    @contextmanager
+    def buffered(size=64 * 1024, interval=0.1):
+        """
+        Replaces sys.stdout with a BufferedStream while inside the with-block,
+        so that output (including prints from the tests themselves) is written
+        in large chunks. Does nothing if stdout already is buffered.
+        """
+        if isinstance(sys.stdout, BufferedStream):
+            yield sys.stdout
+            return
+        stream = BufferedStream(sys.stdout, size=size, interval=interval)
+        sys.stdout = stream
+        try:
+            yield stream
+        finally:
+            sys.stdout = stream.stream
+            stream.flush()
+
+    @staticmethod
+    def unbuffered():
+        """Restores the stream below a BufferedStream, dropping what it holds."""
+        if isinstance(sys.stdout, BufferedStream):
+            sys.stdout = sys.stdout.stream
+
+    @staticmethod
+    def fail(message, end = '\n', background=False, foreground=9):
+        if background: 
+            background=9
+            foreground=0
+        ColorPrint.print(message, foreground=foreground, background=background, end=end)
+
+    @staticmethod
+    def green(message, end = '\n', background=False, foreground=48):
+        if background: 
+            background=48
+            foreground=0
+        ColorPrint.print(message, background=background, foreground=foreground, end=end)
+        
+    @staticmethod
+    def warn(message, end = '\n', background=False, foreground=3):
+        if background: 
+            background=3
+            foreground=0
+        ColorPrint.print(message, background=background, foreground=foreground, end=end)
+
+    @staticmethod
+    def info(message, end = '\n', background=False, foreground=45):
+        if background: 
+            background=45
+            foreground=0
+        ColorPrint.print(message, background=background, foreground=foreground, end=end)
+        
+    @staticmethod
+    def white(message, end = '\n', background=False, foreground=231):
+        if background: 
+            background=7
+            foreground=0
+        ColorPrint.print(message, background=background, foreground=foreground, end=end,)
+
+        
+if __name__ == "__main__":
+    ColorPrint.fail("ThisText fails: ", end="")
+    ColorPrint.fail("HARD",background=True)
+   
+    ColorPrint.green("ThisText passes ",end="")
+    ColorPrint.green("HARD",background=True)
+    
+    ColorPrint.warn("ThisText warns: ", end="")
+    ColorPrint.warn("HARD",background=True)
+
+    ColorPrint.info("ThisText informs: ", end="")
+    ColorPrint.info("HARD",background=True)
+
+    ColorPrint.white("ThisText is white ",end="")
+    ColorPrint.white("HARD",background=True)
+
+    
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Records which source files a test executes, so that a later run can
+skip the tests whose files have not changed since they last passed.
+"""
+
+import hashlib
+import os
+import sys
+import sysconfig
+from contextlib import contextmanager
+
+# Files in the standard library and installed packages are assumed not to change.
+_IGNORED_PREFIXES = tuple(os.path.join(os.path.abspath(path), "") for path in
+    {sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")})
+
+@contextmanager
+def track():
+    """
+    Collects the source file of every function called in the with-block
+    (in the current thread) into the yielded set. Tracing replaces any
+    other trace function, like a debugger or coverage, for the duration.
+    """
+    codes = set()
+    def tracer(frame, event, arg):
+        codes.add(frame.f_code)
+        return None # no line events, only calls
+    previous = sys.gettrace()
+    sys.settrace(tracer)
+    files = set()
+    try:
+        yield files
+    finally:
+        sys.settrace(previous)
+        files.update(_sourceFiles({code.co_filename for code in codes}))
+
+def _sourceFiles(filenames):
+    for filename in filenames:
+        path = os.path.abspath(filename)
+        if path.startswith(_IGNORED_PREFIXES) or not os.path.isfile(path):
+            continue # a library or not a file, like "<string>"
+        yield _relative(path)
+
+def _relative(path):
+    relative = os.path.relpath(path)
+    return path if relative.startswith(os.pardir) else relative
+
+def fileHash(path):
+    """Returns the sha1 of the file's content, or None if it can't be read."""
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except OSError:
+        return None
+
+class DependencyMap:
+    """
+    The source files every test executed when it last ran, with the hashes
+    the files had then, and the tests that failed. Stored in the Cache.
+    Hashes are kept per test, so tests that did not run (like the tests
+    of another shard) are still compared against what they last saw.
+    """
+    def __init__(self, cache, key):
+        self.cache = cache
+        self.key = key
+        stored = cache.get(key, {})
+        self.tests = stored.get("tests", {}) # test name -> {file: sha1 when recorded}
+        self.failed = set(stored.get("failed", []))
+
+    def affected(self, names):
+        """
+        Returns the names of the tests that have to run: tests that have never
+        been recorded, that executed a file which has changed, or that failed
+        last time.
+        """
+        hashes = {}
+        def changed(path, recorded):
+            if path not in hashes:
+                hashes[path] = fileHash(path)
+            return hashes[path] != recorded
+        return [name for name in names if name not in self.tests or name in self.failed
+                or any(changed(path, recorded) for path, recorded in self.tests[name].items())]
+
+    def update(self, results):
+        """Records the dependencies and statuses of the tests that ran and saves the map."""
+        hashes = {}
+        for result in results:
+            if result.dependencies is None:
+                # not tracked (e.g. ran concurrently), so it always has to run.
+                self.tests.pop(result.name, None)
+            else:
+                for path in result.dependencies:
+                    if path not in hashes:
+                        hashes[path] = fileHash(path)
+                self.tests[result.name] = {path: hashes[path] for path in result.dependencies}
+            if result == "failed":
+                self.failed.add(result.name)
+            else:
+                self.failed.discard(result.name)
+        self.cache.set(self.key, {"tests": self.tests, "failed": sorted(self.failed)})
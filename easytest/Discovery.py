@@ -0,0 +1,113 @@
+"""
+Finds the test suites in a directory tree for the easytest command,
+see Easytest.main. Which suites a file defines is cached by the file's
+modification time, so unchanged files are not imported just to look
+for suites.
+"""
+
+import fnmatch
+import importlib.util
+import inspect
+import os
+import sys
+
+from .Cache import Cache
+
+# directories that never contain tests of the project itself.
+_IGNORED_DIRECTORIES = {"__pycache__", "node_modules", "site-packages", "venv"}
+
+def findTestFiles(paths, pattern="*.test.py"):
+    """Yields the files below `paths` whose names match `pattern`, sorted per directory."""
+    for path in paths:
+        if os.path.isfile(path):
+            yield os.path.normpath(path)
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories[:] = sorted(name for name in subdirectories
+                if not name.startswith(".") and name not in _IGNORED_DIRECTORIES)
+            for name in sorted(files):
+                if fnmatch.fnmatch(name, pattern):
+                    yield os.path.normpath(os.path.join(directory, name))
+
+def moduleName(path):
+    """The name a test file is imported under, e.g. "tests.treap.test" for tests/treap.test.py."""
+    relative = os.path.relpath(os.path.abspath(path))
+    if relative.startswith(os.pardir):
+        relative = os.path.basename(path)
+    return os.path.splitext(relative)[0].replace(os.sep, ".")
+
+def loadModule(path):
+    """Imports a test file the way running it as a script would, but not as __main__."""
+    name = moduleName(path)
+    if name in sys.modules:
+        return sys.modules[name]
+    directory = os.path.dirname(os.path.abspath(path))
+    if directory not in sys.path:
+        # lets the test file import the modules next to it.
+        sys.path.insert(0, directory)
+    spec = importlib.util.spec_from_file_location(name, os.path.abspath(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+def suiteClasses(module):
+    """The TestSuite subclasses defined (not just imported) in `module`."""
+    from .Easytest import TestSuite
+    return [cls for _, cls in inspect.getmembers(module, inspect.isclass)
+            if issubclass(cls, TestSuite) and cls is not TestSuite
+            and cls.__module__ == module.__name__]
+
+def loadSuite(path, className):
+    return getattr(loadModule(path), className)
+
+
+class Discovery:
+    """
+    Maps test files to the names of the suites they define. With a
+    `cacheDir` the mapping is kept between runs, and a file is only
+    imported again once its modification time or size changes.
+    """
+    cacheKey = "discovery"
+
+    def __init__(self, cacheDir=".easytest_cache"):
+        self.cache = Cache(cacheDir) if cacheDir is not None else None
+        self.imported = 0 # number of files imported by the latest discover
+        # (path, formatted traceback) of the files the latest discover couldn't import.
+        self.errors = []
+
+    def discover(self, files):
+        """
+        Returns a list of (path, className) for every suite in `files`. Files
+        that raise when imported, e.g. with a syntax error, are left out and
+        listed in `errors`, and imported again next time.
+        """
+        known = self.cache.get(self.cacheKey, {}) if self.cache is not None else {}
+        # keep what is known about files outside `files`, unless they were deleted.
+        entries = {key: entry for key, entry in known.items() if os.path.exists(key)}
+        suites = []
+        self.imported = 0
+        self.errors = []
+        for path in files:
+            stat = os.stat(path)
+            key = os.path.abspath(path)
+            entry = known.get(key)
+            if entry is None or entry[:2] != [stat.st_mtime_ns, stat.st_size]:
+                try:
+                    names = [cls.__name__ for cls in suiteClasses(loadModule(path))]
+                except Exception:
+                    import traceback
+                    self.errors.append((path, traceback.format_exc()))
+                    entries.pop(key, None)
+                    continue
+                entry = [stat.st_mtime_ns, stat.st_size, names]
+                self.imported += 1
+            entries[key] = entry
+            suites.extend((path, name) for name in entry[2])
+        if self.cache is not None and entries != known:
+            self.cache.set(self.cacheKey, entries)
+        return suites
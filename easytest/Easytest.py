@@ -0,0 +1,850 @@
+
+"""
+A small test module inspired by the javascript test
+library jest and the python test library unittest.
+"""
+
+import sys, os
+import time
+import itertools
+from contextlib import contextmanager
+
+from .ColorPrint import ColorPrint 
+from .Expect import Expect
+from .MessageHandler import _MessageHandler
+from .Reporter import ColorReporter
+from .Result import TestResult, RunSummary
+from .Cache import Cache
+
+from .exceptions import ExpectationFailure, TimeoutFailure
+
+# Modules that only some runs need (asyncio, multiprocessing, traceback, ...) are
+# imported where they are used, so that `import Easytest` stays fast.
+
+def __getattr__(name):
+    # re-exported for `from Easytest import compileSubset, fixture`, loaded on first use.
+    if name == "compileSubset":
+        from .helpers import compileSubset
+        return compileSubset
+    if name == "fixture":
+        from .Fixtures import fixture
+        return fixture
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+class TestSuite:
+    """
+    Class for running test suites with setup and teardown.
+    Test methods should end with "Test".
+
+    Progress and failures are displayed by `reporter`, by default a
+    ColorReporter. See Reporter.py for the events a reporter receives.
+
+    The durations of the tests are saved in `cacheDir` after every run,
+    set it to None to not save anything.
+
+    A test that runs longer than `testTimeout` seconds, or than the
+    seconds given to its @timeout decorator, fails with a TimeoutFailure.
+
+    Profiled runs write their profile to `profileDir`, see run, and the
+    snapshots of Expect.toMatchSnapshot are kept in `snapshotDir`.
+    """
+    cacheDir = ".easytest_cache"
+    # number of earlier durations kept per test.
+    historyLength = 10
+    # seconds every test may take, None for no limit.
+    testTimeout = None
+    # where profiled runs write their profile.
+    profileDir = os.path.join(".easytest_cache", "profiles")
+    # where the snapshots of toMatchSnapshot are kept, None for __snapshots__ next to the test file.
+    snapshotDir = None
+
+    def __init__(self, exit_gracefully=False, reporter=None):
+        self._messageHandler = _MessageHandler()
+        self.reporter = reporter if reporter is not None else ColorReporter()
+        # values of the suite scoped fixtures, see Fixtures.py.
+        self._fixtureValues = {}
+        # get test methods to run (modified from StackOverflow)
+        # https://stackoverflow.com/questions/1911281/how-do-i-get-list-of-methods-in-a-python-class
+        # (the name is checked first so that getattr doesn't build fixtures)
+        testnames = [func for func in dir(self) if func.endswith("Test") and callable(getattr(self, func))]
+        self._tests = [getattr(self, test) for test in testnames]
+        self._status = dict()  # in case anyone wants this. Holds a TestResult per test.
+        self._run_time = None
+        # earlier durations of the tests in nanoseconds, oldest first.
+        self._timingHistory = dict()
+        # tests that failed last time, scheduled before the others (failed_first runs).
+        self._runFirst = set()
+        # tests not run because nothing they depend on changed (incremental runs).
+        self._skipped = []
+        # tests not run because too many tests failed (fail_fast runs) or beforeAll failed,
+        # which of the two is in _notRunCause: "fail_fast" or "beforeAll".
+        self._notRun = []
+        self._notRunCause = None
+        # the results of the latest run, in the order they were reported.
+        self._lastRun = []
+        self._trackDependencies = False
+        self._traceMemory = False
+        # the Profiling.Profile of a profiled run, and the file it was written to.
+        self._profile = None
+        self._profilePath = None
+        # the Snapshots.SnapshotStore of the latest run.
+        self._snapshots = None
+        # the cases of parametrized tests by name, when they were expanded up front.
+        self._caseIndex = {}
+        self._failLimit = 0
+        # counted while reporting, so summary() doesn't walk all results.
+        self._passed = 0
+        self._failed = []
+        self.exit_gracefully = exit_gracefully
+
+    def beforeEach(self):
+        """This function runs before each testcase. Feel free to override."""
+        pass
+
+    def afterEach(self):
+        """This function runs after each testcase. Feel free to override."""
+        pass
+
+    def beforeAll(self):
+        """This function runs once before the first testcase. Feel free to override."""
+        pass
+
+    def afterAll(self):
+        """This function runs once after the last testcase. Feel free to override."""
+        pass
+
+    @property
+    def _currently_running(self):
+        """
+        The name of the running test. Follows the message handler's context,
+        so every concurrently running coroutine test sees its own name.
+        """
+        return self._messageHandler.context
+
+    def _suiteId(self):
+        """Identifies the suite in the cache, e.g. "tests.test_treap.TreapTest"."""
+        module = type(self).__module__
+        if module in ("__main__", "__mp_main__"):
+            mainFile = getattr(sys.modules.get("__main__"), "__file__", None) or module
+            module = os.path.splitext(os.path.basename(mainFile))[0]
+        return "{}.{}".format(module, type(self).__qualname__)
+
+    def _snapshotPath(self):
+        directory = self.snapshotDir
+        if directory is None:
+            testFile = getattr(sys.modules.get(type(self).__module__), "__file__", None)
+            directory = os.path.join(os.path.dirname(os.path.abspath(testFile or "")), "__snapshots__")
+        return os.path.join(directory, self._suiteId() + ".snap")
+
+    def _saveTimings(self):
+        """Adds the durations of this run to the timing history in the cache."""
+        if self.cacheDir is None:
+            return
+        keep = self.historyLength - 1
+        history = {name: durations[len(durations) - keep:] if keep else []
+                   for name, durations in self._timingHistory.items()}
+        for name, result in self._status.items():
+            history.setdefault(name, []).append(result.duration)
+        Cache(self.cacheDir).set("durations/" + self._suiteId(), history)
+
+    def run(self, workers=None, concurrency=10, shard=None, total=None, incremental=False,
+            fail_fast=False, failed_first=False, trace_memory=False, profile=None, only=None,
+            update_snapshots=False):
+        """
+        Runs all tests, that is, all class methods whose names ends with "Test".
+        If any test fails, continue to run other tests. Displays helpful information
+        while running the tests and reports whether a test failed or succeeded.
+        If a test fails, a helpful error message is displayed.
+
+        If `workers` is larger than 1 the tests are spread across a pool of
+        that many processes. The results are merged in the same order as a
+        serial run, so the output is identical.
+
+        Coroutine tests (`async def fooTest`) run concurrently on a single
+        event loop after the other tests, at most `concurrency` at a time.
+        They share the suite instance, so use `concurrency=1` if beforeEach
+        sets up state on `self` that the tests must not share.
+
+        Workers and coroutine tests start the tests that took longest in
+        earlier runs first, so that no worker is left with a long test at the end.
+
+        With `shard=i, total=N` only the i:th (counting from 0) of N shards
+        of the tests is run. The shards are balanced using the durations of
+        earlier runs, so every machine needs the same timing history
+        (`cacheDir`) to compute the same shards. Sharded runs don't add
+        to that history, so that the shards run one after another agree.
+
+        With `incremental=True` the source files every test executes are
+        recorded in `cacheDir`, and only the tests that are new, failed last
+        time or executed a file that has changed since they last ran are run.
+        Concurrently run coroutine tests are not tracked and always run.
+
+        With `fail_fast=True` the run stops after the first failing test, or
+        after `fail_fast` failing tests if it is a number, and failures are
+        reported as soon as they happen. With `failed_first=True` the tests
+        that failed in the previous run (saved in `cacheDir`) run first.
+
+        With `trace_memory=True` every test is traced with tracemalloc, and
+        its result records the peak and net bytes it allocated and the lines
+        that allocated the most (see Memory.py). Tracing makes allocations
+        several times slower, and coroutine tests run one at a time so that
+        their allocations are not mixed up.
+
+        With `profile="cprofile"` (or True) every test method is profiled with
+        cProfile, and with `profile="sample"` by sampling its stack every
+        millisecond of CPU time, which slows the tests down much less. Only
+        the test methods are profiled, and the frames of easytest itself are
+        left out of the hotspots. Every TestResult gets the hotspots of its
+        test in `profile`, and the profile of the whole run is written to
+        `profileDir`, as a pstats file or as collapsed stacks for flame graphs.
+        Coroutine tests run one at a time, like with trace_memory.
+
+        With `only` set to a collection of test names only those tests run.
+        The name of a parametrized test selects all of its cases.
+
+        With `update_snapshots=True` snapshots that don't match (see
+        Expect.toMatchSnapshot) are replaced instead of failing the test.
+        New and replaced snapshots are saved in one write after the tests.
+        """
+        # output is buffered and written in large chunks, see ColorPrint.buffered.
+        with ColorPrint.buffered():
+            _start_time = time.perf_counter()
+            if self.cacheDir is not None:
+                self._timingHistory = Cache(self.cacheDir).get("durations/" + self._suiteId(), {})
+            self.reporter.onSuiteStart(self)
+            self._caseIndex = {}
+            if (total is not None or incremental or failed_first or only is not None
+                    or (workers is not None and workers > 1)):
+                # these need all tests up front, parametrized tests are expanded here.
+                tests = list(self._expandAll())
+                self._caseIndex = {test.__name__: test for test in tests if isinstance(test, _Case)}
+            else:
+                tests = self._expandAll() # cases are generated as the tests run
+            if only is not None:
+                only = set(only)
+                tests = [test for test in tests if test.__name__ in only or test.__name__.split("[")[0] in only]
+            if total is not None:
+                tests = self._shard(tests, shard, total)
+            dependencyMap = None
+            self._skipped = []
+            self._trackDependencies = incremental
+            self._traceMemory = trace_memory
+            self._profilePath = None
+            self._profile = None
+            from . import Snapshots
+            cache = Cache(self.cacheDir) if self.cacheDir is not None else None
+            self._snapshots = Snapshots.SnapshotStore(self._snapshotPath(), cache, "snapshots/" + self._suiteId(),
+                                                      update_snapshots)
+            self._messageHandler.snapshots = self._snapshots
+            self._messageHandler.cacheDir = self.cacheDir
+            if profile:
+                from . import Profiling
+                self._profile = Profiling.Profile("cprofile" if profile is True else profile)
+            if profile or trace_memory:
+                # the expectations import the helpers on first use, which is not the first test's cost.
+                from . import helpers
+            if incremental:
+                if self.cacheDir is None:
+                    raise ValueError("incremental runs need a cacheDir to store the dependencies in")
+                from . import Dependencies
+                dependencyMap = Dependencies.DependencyMap(Cache(self.cacheDir), "dependencies/" + self._suiteId())
+                affected = set(dependencyMap.affected([test.__name__ for test in tests]))
+                self._skipped = [test.__name__ for test in tests if test.__name__ not in affected]
+                tests = [test for test in tests if test.__name__ in affected]
+            previouslyFailed = set()
+            if self.cacheDir is not None:
+                previouslyFailed = set(Cache(self.cacheDir).get("failed/" + self._suiteId(), []))
+            self._runFirst = previouslyFailed if failed_first else set()
+            if failed_first:
+                tests = sorted(tests, key=lambda test: test.__name__ not in previouslyFailed)
+            self._failLimit = int(fail_fast)
+            self._passed = 0
+            self._failed = []
+            self._lastRun = []
+            # an incremental run may have nothing to run, then there is nothing to set up either.
+            setUp = tests != [] and self._runHook("beforeAll", self.beforeAll)
+            if not setUp:
+                names = [test.__name__ for test in tests] # none of them run
+            elif workers is not None and workers > 1:
+                names = [test.__name__ for test in tests]
+                self._runParallel(tests, workers)
+            else:
+                names = []
+                coroutineTests = []
+                for test in tests:
+                    names.append(test.__name__)
+                    if self._shouldStop():
+                        continue # only collect the names of the tests not run
+                    if _isCoroutineTest(test):
+                        coroutineTests.append(test)
+                        continue
+                    self._messageHandler.setContext(test.__name__)
+                    self.reporter.onTestStart(test.__name__)
+                    self._reportResult(test.__name__, self._execute(test))
+                if coroutineTests and not self._shouldStop():
+                    import asyncio
+                    oneAtATime = trace_memory or self._profile is not None
+                    asyncio.run(self._runConcurrently(coroutineTests, 1 if oneAtATime else concurrency))
+            if setUp:
+                self._runHook("afterAll", self.afterAll)
+            from . import Fixtures
+            self._runHook("fixtures", lambda: Fixtures.tearDown(self._fixtureValues))
+            self._runHook("snapshots", self._snapshots.flush)
+            self._run_time = round(time.perf_counter() - _start_time, 2)
+            ran = {result.name for result in self._lastRun}
+            self._notRun = [name for name in names if name not in ran]
+            self._notRunCause = None if not self._notRun else "fail_fast" if setUp else "beforeAll"
+            if shard is None:
+                self._saveTimings()
+            if self.cacheDir is not None:
+                failed = (previouslyFailed - ran) | set(self._failed)
+                Cache(self.cacheDir).set("failed/" + self._suiteId(), sorted(failed))
+            if dependencyMap is not None:
+                dependencyMap.update(self._lastRun)
+            if self._profile is not None:
+                self._profilePath = self._profile.write(self.profileDir, self._suiteId())
+            self._messageHandler.popAll(self.reporter)
+            self.reporter.onSummary(self)
+            if self._failed:
+                sys.exit(not self.exit_gracefully) # 0 if should exit gracefully, 1 otherwise.
+
+    def _runHook(self, name, hook):
+        """
+        Runs beforeAll, afterAll or the teardown of the fixtures. An error in
+        it is reported like a failed test called `name`. Returns whether it passed.
+        """
+        self._messageHandler.setContext(name)
+        try:
+            _runToCompletion(hook())
+        except Exception as error:
+            self._queueFailure(error)
+            self.reporter.onTestFail(name)
+            self.reporter.onTestResult(TestResult(name, "failed"), *self._messageHandler.messages(name))
+            self._failed.append(name)
+            return False
+        return True
+
+    def _expandAll(self):
+        """Yields the tests, with every parametrized test replaced by its cases."""
+        for test in self._tests:
+            if hasattr(test, "cases"):
+                yield from self._expand(test)
+            else:
+                yield test
+
+    def _expand(self, test):
+        """Yields the cases of a parametrized test, generating them only as they are needed."""
+        cases = test.cases() if callable(test.cases) else test.cases
+        for index, case in enumerate(cases):
+            yield _Case(test, index, case if isinstance(case, tuple) else (case,))
+
+    def _testByName(self, name):
+        """The test or case called `name`, e.g. "fooTest" or "fooTest[3]"."""
+        if name in self._caseIndex:
+            return self._caseIndex[name]
+        if name.endswith("]"):
+            # a case that wasn't expanded in this process, generate the cases up to it.
+            testName, index = name[:-1].split("[")
+            return next(itertools.islice(self._expand(getattr(self, testName)), int(index), None))
+        return getattr(self, name)
+
+    def _execute(self, test):
+        """
+        Runs a single test between beforeEach and afterEach, queues
+        any error in the current context and records the status.
+        """
+        if not self._trackDependencies:
+            return self._runLifecycle(test)
+        from . import Dependencies
+        with Dependencies.track() as files:
+            result = self._runLifecycle(test)
+        result.dependencies = files
+        return result
+
+    def _runLifecycle(self, test):
+        # can try: except: here to catch errors and display more verbose error messages.
+        result = TestResult(test.__name__)
+        start = time.perf_counter_ns()
+        _runToCompletion(self.beforeEach())
+        testStart = time.perf_counter_ns()
+        try:
+            with _deadline(self._timeoutOf(test)), _tracedMemory(result, self._traceMemory), \
+                    _profiled(result, self._profile, sys._getframe(), test):
+                _runToCompletion(test())
+        except (Exception, TimeoutFailure) as error:
+            self._queueFailure(error)
+            result.status = "failed"
+        else:
+            result.status = "passed"
+        testEnd = time.perf_counter_ns()
+        _runToCompletion(self.afterEach())
+        result.beforeEachTime = testStart - start
+        result.testTime = testEnd - testStart
+        result.afterEachTime = time.perf_counter_ns() - testEnd
+        if self._snapshots is not None:
+            result.snapshots = self._snapshots.takeWritten(test.__name__)
+        self._status[test.__name__] = result
+        return result
+
+    async def _executeAsync(self, test):
+        """Same as _execute but awaits the test and any async beforeEach/afterEach."""
+        result = TestResult(test.__name__)
+        start = time.perf_counter_ns()
+        await _awaitIfNeeded(self.beforeEach())
+        testStart = time.perf_counter_ns()
+        try:
+            seconds = self._timeoutOf(test)
+            with _tracedMemory(result, self._traceMemory), _profiled(result, self._profile, sys._getframe(), test):
+                await (test() if seconds is None else _awaitWithTimeout(test(), seconds))
+        except (Exception, TimeoutFailure) as error:
+            self._queueFailure(error)
+            result.status = "failed"
+        else:
+            result.status = "passed"
+        testEnd = time.perf_counter_ns()
+        await _awaitIfNeeded(self.afterEach())
+        result.beforeEachTime = testStart - start
+        result.testTime = testEnd - testStart
+        result.afterEachTime = time.perf_counter_ns() - testEnd
+        if self._snapshots is not None:
+            result.snapshots = self._snapshots.takeWritten(test.__name__)
+        self._status[test.__name__] = result
+        return result
+
+    def _timeoutOf(self, test):
+        """The seconds `test` may take: from its @timeout decorator, else testTimeout."""
+        return getattr(test, "timeout", self.testTimeout)
+
+    def _queueFailure(self, error):
+        # ExpectationFailure is raised because Expect doesn't know if
+        # it is running in a testsuite.
+        import traceback
+        exc_type, exc_value, exc_traceback = sys.exc_info()
+        tracebackFormatted = traceback.format_tb(exc_traceback)
+        if isinstance(error, TimeoutFailure) and error.stack is not None:
+            tracebackFormatted = error.stack
+        if not isinstance(error, ExpectationFailure):
+            self._messageHandler.queueError(error, tracebackFormatted)
+
+    async def _runConcurrently(self, tests, concurrency):
+        """
+        Runs coroutine tests on the running event loop, at most `concurrency`
+        at a time. Each test runs in its own task, and therefore in its own
+        copy of the message handler's context.
+        """
+        for test in tests:
+            # reserve the contexts so messages are displayed in test order.
+            self._messageHandler.setContext(test.__name__)
+        # tasks get the semaphore in the order they are created.
+        tests = self._longestFirst(tests)
+        import asyncio
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def runOne(test):
+            async with semaphore:
+                if self._shouldStop():
+                    return
+                self._messageHandler.setContext(test.__name__)
+                self.reporter.onTestStart(test.__name__)
+                self._reportResult(test.__name__, await self._executeAsync(test))
+
+        await asyncio.gather(*(runOne(test) for test in tests))
+
+    def _reportResult(self, name, result):
+        if result.snapshots:
+            self._snapshots.queue(result.snapshots)
+        if self._profile is not None and result.profile is not None:
+            # the raw profile is only kept in the profile of the whole run.
+            result.profile = self._profile.add(name, result.profile)
+        self._lastRun.append(result)
+        if result == "failed":
+            self.reporter.onTestFail(name)
+        else:
+            self.reporter.onTestPass(name)
+        self.reporter.onTestResult(result, *self._messageHandler.messages(name))
+        if result == "failed":
+            if self._failLimit:
+                # report right away instead of after all tests.
+                self._messageHandler.popContext(name, self.reporter)
+            self._failed.append(name)
+        else:
+            self._passed += 1
+
+    def _shouldStop(self):
+        """Whether a fail_fast run has seen enough failures."""
+        return bool(self._failLimit) and len(self._failed) >= self._failLimit
+
+    def summary(self):
+        """Returns a RunSummary of the latest run: counts and the names of the failed tests."""
+        return RunSummary(self._passed, list(self._failed), len(self._skipped), len(self._notRun), self._run_time)
+
+    def _longestFirst(self, tests):
+        from . import Scheduler
+        names = Scheduler.longestFirst([test.__name__ for test in tests], self._timingHistory, self._runFirst)
+        byName = {test.__name__: test for test in tests}
+        return [byName[name] for name in names]
+
+    def _shard(self, tests, shard, total):
+        """Returns the tests of shard number `shard` out of `total`."""
+        if not 0 <= shard < total:
+            raise ValueError("shard must be between 0 and {}, not {}".format(total - 1, shard))
+        from . import Scheduler
+        names = Scheduler.partition([test.__name__ for test in tests], self._timingHistory, total)[shard]
+        names = set(names)
+        return [test for test in tests if test.__name__ in names]
+
+    def _runParallel(self, tests, workers):
+        """
+        Runs the tests in a process pool, longest first (after the tests that
+        failed last time in failed_first runs), in chunks that get shorter
+        towards the end, see Scheduler.chunks. Every worker runs its
+        own beforeEach/afterEach around each test and sends back the status
+        and the queued messages, which are merged and reported in test order.
+        A worker stuck in a test with a timeout is killed and replaced.
+        """
+        names = [test.__name__ for test in tests]
+        for name in names:
+            # reserve the contexts so messages are displayed in test order.
+            self._messageHandler.setContext(name)
+        from . import Scheduler
+        scheduled = [test.__name__ for test in self._longestFirst(tests)]
+        chunks = Scheduler.chunks(scheduled, self._timingHistory, workers)
+        from . import Fixtures
+        for fixtureName in Fixtures.fixturesOf(type(self), "session"):
+            # built before the workers start so that they all share it.
+            try:
+                getattr(self, fixtureName)
+            except Exception:
+                pass # reported by the tests that use it
+        sys.stdout.flush() # or forked workers inherit the pending output.
+        # results that arrived before the results of the tests before them.
+        waiting = dict()
+        nextIndex = 0
+        from .Workers import WorkerPool, WorkerKilled, WorkerError
+        timeoutOf = lambda name: self._timeoutOf(self._testByName(name))
+        with WorkerPool(workers, _runInWorker, initializer=_initWorker, initargs=(self,),
+                        finalizer=_finishWorker) as pool:
+            for name, outcome in pool.imapUnordered(chunks, timeoutOf):
+                if isinstance(outcome, (WorkerKilled, WorkerError)):
+                    outcome = self._lostResult(name, outcome, timeoutOf(name))
+                _, result, context = outcome
+                waiting[name] = (result, context)
+                while nextIndex < len(names) and names[nextIndex] in waiting:
+                    name = names[nextIndex]
+                    result, context = waiting.pop(name)
+                    self._messageHandler.mergeContext(name, context)
+                    self._status[name] = result
+                    self._reportResult(name, result)
+                    nextIndex += 1
+                    if self._shouldStop():
+                        return # leaving the with-block terminates the workers
+
+    def _lostResult(self, name, outcome, seconds):
+        """
+        Records a test whose worker raised, died or was killed after its
+        timeout as failed, returning what _runInWorker would.
+        """
+        from .Workers import WorkerError
+        self._messageHandler.setContext(name)
+        if isinstance(outcome, WorkerError): # e.g. raised by beforeEach
+            self._messageHandler.queueError(outcome.error, outcome.stack, outcome.errorType)
+            return name, TestResult(name, "failed"), None
+        if outcome.timedOut:
+            error = TimeoutFailure(seconds, outcome.stack or ["  (the worker was killed before it dumped its stack)\n"])
+        else:
+            error = RuntimeError("The worker running the test died with exit code {}".format(outcome.exitcode))
+        self._messageHandler.queueError(error, outcome.stack or None)
+        return name, TestResult(name, "failed", testTime=int(outcome.elapsed * 10**9)), None
+
+    @property
+    def expect(self):
+        """
+        Returns Expectation objects connected to this test suite: `self.expect(obj)`
+        checks one object and `self.expect.each(iterable)` every item of an iterable.
+        """
+        return _SuiteExpect(self._messageHandler)
+
+    def it(self, message):
+        """
+        Adds a descriptive explanation to the currently running test.
+        Example: self.it("should return False for empty case")
+        """
+        capitalizedMessage="{}{}".format(message[0].upper(), message[1:])
+        self._messageHandler.setDescription(capitalizedMessage)
+
+
+class _SuiteExpect:
+    """What TestSuite.expect returns, creates Expect objects tied to a message handler."""
+    __slots__ = ("_messageHandler",)
+
+    def __init__(self, messageHandler):
+        self._messageHandler = messageHandler
+
+    def __call__(self, obj):
+        return Expect(obj, self._messageHandler, context=self._messageHandler.context)
+
+    def each(self, iterable):
+        return Expect.each(iterable, self._messageHandler, context=self._messageHandler.context)
+
+
+def timeout(seconds):
+    """
+    Decorator that sets how many seconds a test may take, instead of
+    the testTimeout of the suite:
+      @timeout(2)
+      def slowTest(self): ...
+    """
+    def decorate(test):
+        test.timeout = seconds
+        return test
+    return decorate
+
+def parametrize(cases):
+    """
+    Decorator that runs a test once for every case in `cases`, as separate
+    tests called "fooTest[0]", "fooTest[1]" and so on. A case that is a tuple
+    is passed as the arguments of the test, anything else as its only argument:
+      @parametrize([(1, 1, 2), (2, 3, 5)])
+      def addTest(self, a, b, expected): ...
+    `cases` can also be a function returning the cases, like a generator
+    function, which is called each time the suite runs.
+    """
+    def decorate(test):
+        test.cases = cases
+        return test
+    return decorate
+
+
+class _Case:
+    """One case of a parametrized test, calls the test with the arguments of the case."""
+    __slots__ = ("test", "args", "__name__")
+
+    def __init__(self, test, index, args):
+        self.test = test
+        self.args = args
+        self.__name__ = "{}[{}]".format(test.__name__, index)
+
+    def __call__(self):
+        return self.test(*self.args)
+
+    @property
+    def timeout(self):
+        # set by the timeout decorator on the test, if at all.
+        return self.test.timeout
+
+def _isCoroutineTest(test):
+    import inspect
+    return inspect.iscoroutinefunction(test.test if isinstance(test, _Case) else test)
+
+def _runToCompletion(result):
+    """Runs the coroutine returned by an async test or hook on a fresh event loop."""
+    import inspect
+    if inspect.iscoroutine(result):
+        import asyncio
+        asyncio.run(result)
+
+@contextmanager
+def _deadline(seconds):
+    """
+    Raises TimeoutFailure in the with-block once it has run for `seconds`,
+    using SIGALRM. Where there is no SIGALRM (Windows, or outside the main
+    thread) the block can't be interrupted, and fails afterwards instead.
+    """
+    if seconds is None:
+        yield
+        return
+    import signal, threading
+    if not hasattr(signal, "SIGALRM") or threading.current_thread() is not threading.main_thread():
+        start = time.perf_counter()
+        yield
+        if time.perf_counter() - start > seconds:
+            raise TimeoutFailure(seconds)
+        return
+    def onAlarm(signalNumber, frame):
+        # the traceback of the exception shows where the test was stuck.
+        raise TimeoutFailure(seconds)
+    previous = signal.signal(signal.SIGALRM, onAlarm)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+@contextmanager
+def _tracedMemory(result, enabled):
+    """Records the memory allocated in the block as `result.memory`, if `enabled`."""
+    if not enabled:
+        yield
+        return
+    from . import Memory
+    with Memory.trace(sites=3) as usage:
+        try:
+            yield
+        finally:
+            result.memory = usage
+
+@contextmanager
+def _profiled(result, profile, boundary, test):
+    """
+    Records the raw profile of `test`, run in the block, as `result.profile`
+    if `profile` is set. `boundary` is the frame running the block, see
+    Profiling.Recording.
+    """
+    if profile is None:
+        yield
+        return
+    from . import Profiling
+    function = test.test if isinstance(test, _Case) else test
+    code = getattr(function, "__func__", function).__code__
+    recording = Profiling.Recording(profile.mode, boundary, (code.co_filename, code.co_firstlineno, code.co_name))
+    recording.start()
+    try:
+        yield
+    finally:
+        result.profile = recording.stop()
+
+async def _awaitWithTimeout(coroutine, seconds):
+    """Awaits the coroutine of an async test, cancelling it after `seconds`."""
+    import asyncio, io
+    task = asyncio.ensure_future(coroutine)
+    done, _ = await asyncio.wait({task}, timeout=seconds)
+    if task in done:
+        return task.result()
+    stack = io.StringIO()
+    task.print_stack(file=stack)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    raise TimeoutFailure(seconds, stack.getvalue().splitlines(keepends=True))
+
+async def _awaitIfNeeded(result):
+    import inspect
+    if inspect.isawaitable(result):
+        await result
+
+
+# The suite a pool worker runs its tests on, set once per worker process.
+_workerSuite = None
+
+def _initWorker(suite):
+    global _workerSuite
+    _workerSuite = suite
+    # prints in the tests go straight to stdout, the parent does the reporting.
+    ColorPrint.unbuffered()
+    # the parent tears down the fixtures it built, the worker those it builds itself.
+    from . import Fixtures
+    Fixtures.forgetInherited()
+    suite._fixtureValues = {fixture: (value, None) for fixture, (value, _) in suite._fixtureValues.items()}
+
+def _finishWorker():
+    from . import Fixtures
+    Fixtures.tearDown(_workerSuite._fixtureValues)
+    Fixtures.tearDown(Fixtures._shared)
+
+def _runInWorker(name):
+    """Runs one test in a worker process and returns what the parent needs."""
+    suite = _workerSuite
+    suite._messageHandler.setContext(name)
+    result = suite._execute(suite._testByName(name))
+    return name, result, suite._messageHandler.exportContext(name)
+
+
+def main(argv=None):
+    """
+    Entry point of the easytest command: runs every TestSuite subclass
+    in the files below the given paths in one process, or spread over
+    a pool of processes with --workers. With --watch it keeps running,
+    see Watch.py. Returns the exit code.
+    """
+    import argparse
+    from .Discovery import Discovery, findTestFiles
+    parser = argparse.ArgumentParser(prog="easytest",
+        description="Runs the test suites found in the files below the given paths.")
+    parser.add_argument("paths", nargs="*", default=["."],
+        help="files or directories to search, by default the working directory")
+    parser.add_argument("--pattern", default="*.test.py",
+        help="file names to search for suites (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=None,
+        help="run the suites in a pool of this many processes")
+    parser.add_argument("--fail-fast", type=int, nargs="?", const=1, default=False, metavar="N",
+        help="stop a suite after its first (or Nth) failing test")
+    parser.add_argument("--failed-first", action="store_true",
+        help="run the tests that failed last time first")
+    parser.add_argument("--incremental", action="store_true",
+        help="only run tests affected by changes since the last run")
+    parser.add_argument("--update-snapshots", action="store_true",
+        help="replace the snapshots that don't match instead of failing")
+    parser.add_argument("--watch", action="store_true",
+        help="keep running, and rerun the tests affected by every change to a .py file (ignores --workers)")
+    arguments = parser.parse_args(argv)
+    if arguments.watch:
+        from .Watch import Watch
+        return Watch(arguments.paths, arguments.pattern, {"fail_fast": arguments.fail_fast,
+            "failed_first": arguments.failed_first, "update_snapshots": arguments.update_snapshots}).loop()
+
+    _start_time = time.perf_counter()
+    discovery = Discovery(TestSuite.cacheDir)
+    suites = discovery.discover(findTestFiles(arguments.paths, arguments.pattern))
+    for path, error in discovery.errors:
+        # the other files still run.
+        ColorPrint.info(path)
+        ColorPrint.fail(error)
+    options = {"fail_fast": arguments.fail_fast, "failed_first": arguments.failed_first,
+               "incremental": arguments.incremental, "update_snapshots": arguments.update_snapshots}
+    jobs = [(path, className, options) for path, className in suites]
+    results = [] # whether each suite failed
+    if arguments.workers is not None and arguments.workers > 1 and len(jobs) > 1:
+        import multiprocessing
+        sys.stdout.flush()
+        with multiprocessing.Pool(min(arguments.workers, len(jobs))) as pool:
+            # every worker captures the output of its suite, it is printed here in order.
+            for (path, className, _), (failed, output) in zip(jobs, pool.imap(_runSuiteCaptured, jobs)):
+                ColorPrint.info("{} {}".format(path, className))
+                sys.stdout.write(output)
+                results.append(failed)
+    else:
+        for job in jobs:
+            ColorPrint.info("{} {}".format(job[0], job[1]))
+            results.append(_runSuite(*job))
+    failed = results.count(True)
+    print()
+    if failed:
+        ColorPrint.fail("{} of {} suites failed".format(failed, len(jobs)))
+    if discovery.errors:
+        count = len(discovery.errors)
+        ColorPrint.fail("{} test file{} could not be imported".format(count, "" if count == 1 else "s"))
+    ColorPrint.info("Ran {} suites in {} seconds".format(len(jobs), round(time.perf_counter() - _start_time, 2)))
+    return 1 if failed or discovery.errors else 0
+
+def _runSuite(path, className, options):
+    """
+    Runs one discovered suite and returns whether it failed: whether any of
+    its tests failed, or the suite itself raised, e.g. in beforeEach.
+    """
+    from .Discovery import loadSuite
+    try:
+        suite = loadSuite(path, className)(exit_gracefully=True)
+        try:
+            suite.run(**options)
+        except SystemExit:
+            pass # run exits after failures, even with exit_gracefully
+    except Exception:
+        import traceback
+        ColorPrint.fail(traceback.format_exc())
+        return True
+    return bool(suite.summary().failed)
+
+def _runSuiteCaptured(job):
+    """Runs a discovered suite in a pool worker and returns (failed, output)."""
+    import io
+    stdout = sys.stdout
+    sys.stdout = io.StringIO()
+    try:
+        failed = _runSuite(*job)
+        return failed, sys.stdout.getvalue()
+    finally:
+        sys.stdout = stdout
+
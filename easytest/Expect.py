@@ -0,0 +1,522 @@
+
+import operator
+from functools import partial
+
+from .MessageHandler import _MessageHandler
+from .exceptions import ExpectationFailure
+
+class Expect:
+    """
+    When you're writing tests, you often need to check that values meet
+    certain conditions. Expect gives access to a number of methods
+    that let you validate different things.
+
+    Each public method represents different expectations of the 
+    object's content. If an expectation fails, a neat error message is 
+    assured.
+    """
+    __slots__ = ("context", "obj", "_negated", "_messageHandler")
+
+    def __init__(self, obj, _messageHandler=None, _negated=False, context=None):
+        """Params:
+            - object: the object to be inspected.
+            - messageHandler: the MessageHandler to use.
+            - _negated: if True, all methods test for the opposite of normal.
+        Attributes:
+            obj: the object to be inspected.
+            messageHandler: the MessageHandler to use.
+            not: an identical Expect object but with 
+                 methods that test for the opposite of normal
+            _negated: if True, all methods test for the opposite of normal.
+        """
+        self.context=context
+        if context is None:
+            self.context = "__main__"
+        self.obj = obj
+        self._negated = _negated
+        self._messageHandler = _messageHandler
+        if _messageHandler is None:
+            self._messageHandler = _MessageHandler()
+        
+    @property
+    def Not(self):
+        """
+        A getter for not, returns an identical Expect object but with 
+        methods that test for the opposite of normal
+        """
+        return Expect(self.obj, self._messageHandler, _negated=not self._negated, context=self.context)
+
+    @staticmethod
+    def each(iterable, _messageHandler=None, context=None):
+        """
+        Returns an ExpectEach object, which checks an expectation for every
+        item of `iterable` in one pass. Example:
+          `Expect.each([1,2,3]).toBeGreaterThan(0)`
+        """
+        return ExpectEach(iterable, _messageHandler, context=context)
+
+    def _fail(self, expected, received, phrase):
+        self._messageHandler.queueExpectation(expected, received, phrase)
+        # the message is just if calling Expect independently of in a testsuite,
+        # it is only formatted if the exception is displayed.
+        raise ExpectationFailure(phrase=phrase, expected=expected, received=received)
+    
+    def _handleExpectation(self, passes, phrase, expected, received):
+        if not passes: # throw ExpectationFailurs
+            self._fail(expected, received, phrase) 
+        return passes
+
+    def _handleArrayExpectation(self, mismatch, phrase, expected):
+        """
+        Like _handleExpectation for an array comparison. The received array
+        is described by `mismatch` (None if all elements matched) instead
+        of being displayed.
+        """
+        passes = (mismatch is None) ^ self._negated
+        if not passes:
+            from .helpers import allMatch
+            received = mismatch if mismatch is not None else allMatch(self.obj)
+            self._fail(expected, received, phrase)
+        return passes
+
+    def toEqual(self, expected):
+        """
+        Expects any object.
+        Passes if the object equals expected object.
+        Numpy arrays are equal if they have the same shape and all elements are equal.
+        """
+        from .helpers.arrays import isArray
+        if isArray(self.obj) or isArray(expected):
+            from .helpers.arrays import compareArrays
+            phrase="array to {}equal".format("not " if self._negated else "")
+            return self._handleArrayExpectation(compareArrays(self.obj, expected), phrase, expected)
+        # bitwise XOR creates correct truth table
+        passes = (self.obj == expected) ^ self._negated 
+        phrase="object to {}equal".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, expected, self.obj)
+
+    def toBe(self, expected):
+        """
+        Expects any object.
+        Passes if the object is (strictly the same) the expected object.
+        """
+        # bitwise XOR creates correct truth table
+        passes = (self.obj is expected) ^ self._negated 
+        phrase="object to {}be strictly equal to".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, expected, self.obj)
+
+    def toHaveLength(self, length):
+        """
+        Expects an object implementing __len__.
+        Passes if object's length is equal to expected length.
+        """
+        # bitwise XOR creates correct truth table
+        passes = (len(self.obj) == length) ^ self._negated 
+        phrase="object to {}have length".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, length, received=len(self.obj))
+
+    def toBeSubset(self, expectedObj):
+        """
+        Expects an object.
+        Passes if `obj` is a subset of the `expected` object.
+        Note that lists are sensitive to order, so `[1,2,3]` is
+        not a subset of `[2,3,1]`.
+
+        You can pass classes if you don't want to be specific 
+        about the value that is allowed. Example: 
+          `Expect({"a":4}).toBeSubset({"a":int})` would pass.
+
+        When faced with a list such as `[class]`, a list is a subset
+        if all items are an instance of the class. For example, this passes:
+          `Expect([1,2,3,4,5]).toBeSubset([int])`
+
+        Tuples and other sequences are treated like lists, mappings like
+        dicts, and sets are subsets in the usual sense (or `{class}` like `[class]`).
+        The failure message shows the path to the first difference.
+
+        When checking many objects against the same template, compile it
+        once with `compileSubset(template)` and pass the result instead.
+        """
+        from .helpers import SubsetMatcher, firstMismatch
+        if isinstance(expectedObj, SubsetMatcher):
+            mismatch = expectedObj.firstMismatch(self.obj)
+        else:
+            mismatch = firstMismatch(self.obj, expectedObj)
+        passes = (mismatch is None) ^ self._negated
+        phrase="object to {}be a *superset* of".format("not " if self._negated else "")
+        if mismatch is not None and not self._negated:
+            phrase += " (first difference at {})".format(mismatch)
+        return self._handleExpectation(passes, phrase, expectedObj, self.obj)
+
+    def toBeInstanceOf(self, expectedClass):
+        """
+        Expects any object.
+        Passes if object is instance of the expected class.
+        """
+        passes = (isinstance(self.obj, expectedClass)) ^ self._negated 
+        phrase="object to {}be an instance of".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, expectedClass, self.obj)
+
+    def toBeGreaterThan(self, numerical):
+        """
+        Expects a numerical.
+        Passes if object is greater than numerical.
+        """
+        passes = (self.obj > numerical) ^ self._negated 
+        phrase="number to {}be greater than".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, numerical, self.obj)
+
+    def toBeLessThan(self, numerical):
+        """
+        Expects a numerical.
+        Passes if object is less than numerical.
+        """
+        passes = (self.obj < numerical) ^ self._negated 
+        phrase="number to {}be less than".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, numerical, self.obj)
+    
+    def toBeGreaterThanOrEqual(self, numerical):
+        """
+        Expects a numerical.
+        Passes if object is greater than or equal to numerical.
+        """
+        return self.Not.toBeLessThan(numerical)
+
+    def toBeLessThanOrEqual(self, numerical):
+        """
+        Expects a numerical.
+        Passes if object is less than or equal to numerical.
+        """
+        return self.Not.toBeGreaterThan(numerical)
+        
+    def toBeNone(self):
+        """
+        Expects anything.
+        Passes if the object is None.
+        """
+        passes = (self.obj is None) ^ self._negated 
+        phrase="object to {}be".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, None, self.obj)
+
+    def toBeTruthy(self):
+        """
+        Expects anything.
+        Passes if the object is truthy.
+        """
+        passes = (not not self.obj) ^ self._negated
+        phrase="object to {}be interpreted as".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, expected=True, received=self.obj)
+
+    def toBeFalsy(self):
+        """
+        Expects anything.
+        Passes if the object is falsy.
+        """
+        passes = (not self.obj) ^ self._negated
+        phrase="object to {}be interpreted as".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, expected=False, received=self.obj)        
+
+    def toBeCloseTo(self, number, numDigits=2):
+        """
+        Expects a numeric type.
+        Passes if object is sufficiently close to 
+        number when accounting for floating point errors.
+        A numpy array passes if all of its elements are close.
+        """
+        from .helpers.arrays import isArray
+        if isArray(self.obj) or isArray(number):
+            from .helpers.arrays import compareArrays
+            phrase = "array to {}be accurate up to {} decimals of".format("not " if self._negated else "", numDigits)
+            isclose = lambda received, expected: abs(received - expected) < 10**(-numDigits)/2
+            return self._handleArrayExpectation(compareArrays(self.obj, number, isclose), phrase, number)
+        passes = (abs(self.obj - number) < 10**(-numDigits)/2) ^ self._negated
+        phrase = "number to {}be accurate up to {} decimals of".format("not " if self._negated else "", numDigits)
+        return self._handleExpectation(passes, phrase, number, self.obj)
+
+    def toBeAllClose(self, expected, rtol=1e-05, atol=1e-08):
+        """
+        Expects a number or a numpy array.
+        Passes if `abs(obj - expected) <= atol + rtol * abs(expected)`,
+        for arrays elementwise, like numpy.allclose.
+        """
+        from .helpers.arrays import isArray, compareArrays
+        isclose = lambda received, expected: abs(received - expected) <= atol + rtol * abs(expected)
+        phrase = "{} to {}be close (rtol={}, atol={}) to".format("array" if isArray(self.obj) else "number",
+                                                               "not " if self._negated else "", rtol, atol)
+        if isArray(self.obj) or isArray(expected):
+            return self._handleArrayExpectation(compareArrays(self.obj, expected, isclose), phrase, expected)
+        passes = isclose(self.obj, expected) ^ self._negated
+        return self._handleExpectation(passes, phrase, expected, self.obj)
+
+    def toHaveShape(self, shape):
+        """
+        Expects an array, that is, an object with a `shape` attribute.
+        Passes if the shape of the array equals `shape`.
+        """
+        passes = (tuple(self.obj.shape) == tuple(shape)) ^ self._negated
+        phrase = "array to {}have shape".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, tuple(shape), received=tuple(self.obj.shape))
+
+    def toHaveDtype(self, dtype):
+        """
+        Expects a numpy array.
+        Passes if the array's dtype equals `dtype`, e.g. "float64" or numpy.int32.
+        """
+        passes = (self.obj.dtype == dtype) ^ self._negated
+        phrase = "array to {}have dtype".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, dtype, received=self.obj.dtype)
+
+    def toMatch(self, regex, flags=0):
+        """
+        Expects a string.
+        Passes if the string matches (re.search) the regular expression.
+        """
+        import re
+        passes = (not not re.search(regex, self.obj, flags=flags)) ^ self._negated
+        phrase="string to {}be matched by the regex".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, regex, self.obj)
+
+    def toBeWithinRange(self, low, high):
+        """
+        Expects an object compatible with <= and < comparisons.
+        Passes if object in interval [low,high).
+        """
+        passes = (low <= self.obj < high) ^ self._negated
+        phrase="string to {}be in the interval".format("not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, 
+                    expected="[{}, {})".format(low,high), received=self.obj)
+
+    def toThrow(self, exception=Exception):
+        """
+        Expects a function taking zero arguments.
+        Passes if the function call throws the expected Exception.
+        If no specific exception provided, any exception is expected. 
+        """
+        result=None
+        try:
+            result = self.obj()
+        except Exception as err:
+            result=err
+            passes = isinstance(err, exception)
+        else:
+            passes=False
+        passes ^= self._negated
+        phrase="function {} to {}throw the exception".format(self.obj.__name__, "not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, exception, received=result)
+
+
+    def toThrowWith(self, *args, **kwargs):
+        """
+        Expects a function.
+        Passes if the function throws an Exception with the provided arguments.
+        """
+        result=None
+        try:
+            result=self.obj(*args, **kwargs)
+        except Exception as err:
+            result=err
+            passes = True
+        else:
+            passes=False
+        passes ^= self._negated
+        phrase="function {} to {}throw an exception".format(self.obj, "not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, Exception, received=result)
+
+    def toRunFasterThan(self, milliseconds, warmup=3, repeat=30):
+        """
+        Expects a function taking zero arguments.
+        Passes if the median time of `repeat` calls of the function, after
+        `warmup` calls, is less than `milliseconds`.
+        """
+        from . import Benchmark
+        timing = Benchmark.measure(self.obj, warmup, repeat)
+        passes = (timing.median < milliseconds * 10**6) ^ self._negated
+        phrase = "function {} to {}have a median run time below (ms)".format(
+            getattr(self.obj, "__name__", self.obj), "not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, milliseconds, received=timing)
+
+    def toNotRegressAgainst(self, baseline, tolerance=0.1, warmup=3, repeat=30):
+        """
+        Expects a function taking zero arguments.
+        Passes if the median time of the function (measured like in
+        toRunFasterThan) is at most `tolerance` (a fraction) slower than the
+        median of the baseline saved under the name `baseline`. The first
+        time a baseline is used, the measured timing is saved as the baseline
+        in the cacheDir of the suite, if it has one. To accept a new baseline,
+        delete it from the baselines directory of the cacheDir.
+        """
+        from . import Benchmark
+        timing = Benchmark.measure(self.obj, warmup, repeat)
+        cacheDir = self._messageHandler.cacheDir
+        expected = Benchmark.loadBaseline(cacheDir, baseline)
+        if expected is None:
+            Benchmark.saveBaseline(cacheDir, baseline, timing)
+            expected = timing
+        passes = (timing.median <= expected.median * (1 + tolerance)) ^ self._negated
+        phrase = "function {} to {}be at most {:.0%} slower than baseline {!r}".format(
+            getattr(self.obj, "__name__", self.obj), "not " if self._negated else "", tolerance, baseline)
+        return self._handleExpectation(passes, phrase, expected, received=timing)
+
+    def toAllocateLessThan(self, size, warmup=1):
+        """
+        Expects a function taking zero arguments.
+        Passes if a call of the function, after `warmup` calls, has less
+        than `size` bytes allocated at its peak, as traced by tracemalloc.
+        """
+        from . import Memory
+        usage = Memory.measure(self.obj, warmup)
+        passes = (usage.peak < size) ^ self._negated
+        phrase = "function {} to {}allocate less than (bytes at peak)".format(
+            getattr(self.obj, "__name__", self.obj), "not " if self._negated else "")
+        return self._handleExpectation(passes, phrase, size, received=usage)
+
+    def toMatchSnapshot(self, name=None):
+        """
+        Expects any object that can be converted to JSON (see Snapshots.serialize).
+        Passes if the object equals the snapshot stored for the test, saving
+        it as the snapshot if there is none yet. A test can check several
+        snapshots, numbered in order or called `name`. Only works in a
+        TestSuite, whose run(update_snapshots=True) replaces changed snapshots.
+        """
+        store = self._messageHandler.snapshots
+        if store is None:
+            raise ValueError("toMatchSnapshot only works in the tests of a TestSuite")
+        if self._negated:
+            raise ValueError("toMatchSnapshot can't be negated")
+        passes, key, expected, diff = store.check(self.context, name, self.obj)
+        phrase = "object to match snapshot {!r} (run with update_snapshots=True to replace it)".format(key)
+        return self._handleExpectation(passes, phrase, expected, received=diff)
+
+
+class EachSummary:
+    """Describes the items that failed an ExpectEach expectation."""
+    __slots__ = ("failures", "total", "sample")
+
+    def __init__(self, failures, total, sample):
+        self.failures = failures
+        self.total = total
+        self.sample = sample
+
+    def __repr__(self):
+        if not self.failures:
+            return "all {} items".format(self.total)
+        from .helpers.shortrepr import shortrepr
+        examples = ", ".join("[{}]: {}".format(i, shortrepr(item, 100)) for i, item in self.sample)
+        return "{} of {} items failed, e.g. {}".format(self.failures, self.total, examples)
+
+
+class ExpectEach:
+    """
+    Checks an expectation for every item of an iterable in one pass,
+    without creating an Expect object per item. All items are checked,
+    and a failure reports how many items failed and the first few of them.
+    Use `self.expect.each(iterable)` in a test suite.
+    """
+    sampleSize = 5
+    __slots__ = ("context", "obj", "_negated", "_messageHandler")
+
+    def __init__(self, iterable, _messageHandler=None, _negated=False, context=None):
+        self.context = context
+        if context is None:
+            self.context = "__main__"
+        self.obj = iterable
+        self._negated = _negated
+        self._messageHandler = _messageHandler
+        if _messageHandler is None:
+            self._messageHandler = _MessageHandler()
+
+    @property
+    def Not(self):
+        """Returns an identical ExpectEach object but for the opposite of normal."""
+        return ExpectEach(self.obj, self._messageHandler, _negated=not self._negated, context=self.context)
+
+    def _checkEach(self, predicate, phrase, expected):
+        """Applies `predicate` to every item and fails if any item doesn't pass."""
+        negated = self._negated
+        failures = total = 0
+        sample = []
+        for total, item in enumerate(self.obj, 1):
+            if bool(predicate(item)) is negated:
+                failures += 1
+                if len(sample) < self.sampleSize:
+                    sample.append((total - 1, item))
+        if failures:
+            received = EachSummary(failures, total, sample)
+            self._messageHandler.queueExpectation(expected, received, phrase)
+            raise ExpectationFailure(phrase=phrase, expected=expected, received=received)
+        return True
+
+    def _phrase(self, text):
+        return "every item to {}{}".format("not " if self._negated else "", text)
+
+    def toEqual(self, expected):
+        """Passes if every item equals expected."""
+        return self._checkEach(partial(operator.eq, expected), self._phrase("equal"), expected)
+
+    def toBe(self, expected):
+        """Passes if every item is (strictly the same) the expected object."""
+        return self._checkEach(partial(operator.is_, expected), self._phrase("be strictly equal to"), expected)
+
+    def toBeGreaterThan(self, numerical):
+        """Passes if every item is greater than numerical."""
+        return self._checkEach(partial(operator.lt, numerical), self._phrase("be greater than"), numerical)
+
+    def toBeLessThan(self, numerical):
+        """Passes if every item is less than numerical."""
+        return self._checkEach(partial(operator.gt, numerical), self._phrase("be less than"), numerical)
+
+    def toBeGreaterThanOrEqual(self, numerical):
+        """Passes if every item is greater than or equal to numerical."""
+        return self._checkEach(partial(operator.le, numerical), self._phrase("be greater than or equal to"), numerical)
+
+    def toBeLessThanOrEqual(self, numerical):
+        """Passes if every item is less than or equal to numerical."""
+        return self._checkEach(partial(operator.ge, numerical), self._phrase("be less than or equal to"), numerical)
+
+    def toBeWithinRange(self, low, high):
+        """Passes if every item is in the interval [low,high)."""
+        return self._checkEach(lambda item: low <= item < high, self._phrase("be in the interval"),
+                               "[{}, {})".format(low, high))
+
+    def toBeCloseTo(self, number, numDigits=2):
+        """Passes if every item is sufficiently close to number, see Expect.toBeCloseTo."""
+        tolerance = 10**(-numDigits)/2
+        return self._checkEach(lambda item: abs(item - number) < tolerance,
+                               self._phrase("be accurate up to {} decimals of".format(numDigits)), number)
+
+    def toBeInstanceOf(self, expectedClass):
+        """Passes if every item is an instance of the expected class."""
+        return self._checkEach(lambda item: isinstance(item, expectedClass),
+                               self._phrase("be an instance of"), expectedClass)
+
+    def toBeNone(self):
+        """Passes if every item is None."""
+        return self._checkEach(partial(operator.is_, None), self._phrase("be"), None)
+
+    def toBeTruthy(self):
+        """Passes if every item is truthy."""
+        return self._checkEach(operator.truth, self._phrase("be interpreted as"), True)
+
+    def toBeFalsy(self):
+        """Passes if every item is falsy."""
+        return self._checkEach(operator.not_, self._phrase("be interpreted as"), False)
+
+    def toHaveLength(self, length):
+        """Passes if every item has the expected length."""
+        return self._checkEach(lambda item: len(item) == length, self._phrase("have length"), length)
+
+    def toMatch(self, regex, flags=0):
+        """Passes if every item is a string matched (re.search) by the regular expression."""
+        import re
+        return self._checkEach(re.compile(regex, flags).search, self._phrase("be matched by the regex"), regex)
+
+    def toBeSubset(self, expectedObj):
+        """
+        Passes if every item is a subset of the expected object, see Expect.toBeSubset.
+        The template is compiled once for all items.
+        """
+        from .helpers import SubsetMatcher, compileSubset
+        matcher = expectedObj
+        if not isinstance(matcher, SubsetMatcher):
+            matcher = compileSubset(expectedObj)
+        return self._checkEach(matcher.matches, self._phrase("be a subset of"), expectedObj)
@@ -0,0 +1,161 @@
+"""
+Fixtures are values that tests share, like a loaded data file or a
+running server. A fixture is built the first time a test uses it and
+reused after that, for as long as its scope lasts.
+"""
+
+import atexit
+import os
+
+SCOPES = ("suite", "process", "session")
+
+# The values of process and session scoped fixtures built in this process,
+# as fixture -> (value, generator to resume for the teardown or None).
+_shared = {}
+
+def fixture(scope="suite", memoize=False, inputs=()):
+    """
+    Decorator that turns a method of a TestSuite into a fixture, an
+    attribute whose value is what the method returns:
+
+      @fixture(scope="process")
+      def server(self):
+          server = startServer()
+          yield server # code after the yield is the teardown
+          server.stop()
+
+      def getTest(self):
+          self.expect(self.server.get("/")).toEqual("ok")
+
+    `scope` decides how long the value is reused:
+      - "suite": for one run of the suite, then torn down after afterAll.
+      - "process": by every suite in the process, torn down at exit. With
+        workers, every worker process builds its own.
+      - "session": like "process", but a parallel run builds it before
+        starting the workers, which all share it.
+
+    With `memoize=True` the value is pickled to the cacheDir of the suite,
+    keyed by a hash of the method's source and of the files in `inputs`,
+    so later runs load it instead of building it until either changes.
+    """
+    if scope not in SCOPES:
+        raise ValueError("scope must be one of {}, not {!r}".format(SCOPES, scope))
+    def decorate(function):
+        return Fixture(function, scope, memoize, tuple(inputs))
+    return decorate
+
+
+class Fixture:
+    """The descriptor the fixture decorator replaces a method with."""
+    def __init__(self, function, scope="suite", memoize=False, inputs=()):
+        import inspect
+        self.function = function
+        self.name = function.__name__
+        self.scope = scope
+        self.memoize = memoize
+        self.inputs = inputs
+        self.isGenerator = inspect.isgeneratorfunction(function)
+        if memoize and self.isGenerator:
+            raise ValueError("fixture {} has a teardown, so its value can't be memoized".format(self.name))
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, suite, owner=None):
+        if suite is None:
+            return self
+        values = suite._fixtureValues if self.scope == "suite" else _shared
+        if self not in values:
+            values[self] = self._build(suite)
+        return values[self][0]
+
+    def _build(self, suite):
+        """Returns the value and the generator to resume for the teardown, if any."""
+        if self.memoize and suite.cacheDir is not None:
+            return self._memoized(suite), None
+        if self.isGenerator:
+            generator = self.function(suite)
+            return next(generator), generator
+        return self.function(suite), None
+
+    def _memoized(self, suite):
+        import pickle
+        directory = os.path.join(suite.cacheDir, "fixtures")
+        prefix = "{}.{}-".format(suite._suiteId(), self.name)
+        path = os.path.join(directory, prefix + self._contentHash() + ".pickle")
+        try:
+            with open(path, "rb") as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+        value = self.function(suite)
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.startswith(prefix): # built from an older source or inputs
+                os.remove(os.path.join(directory, name))
+        temporary = "{}.{}.tmp".format(path, os.getpid())
+        with open(temporary, "wb") as file:
+            pickle.dump(value, file)
+        os.replace(temporary, path)
+        return value
+
+    def _contentHash(self):
+        import hashlib, inspect
+        from .Dependencies import fileHash
+        try:
+            source = inspect.getsource(self.function)
+        except (OSError, TypeError):
+            source = repr(self.function.__code__.co_code)
+        content = hashlib.sha1(source.encode())
+        for path in self.inputs:
+            inputHash = fileHash(path)
+            if inputHash is None:
+                raise FileNotFoundError("the input {!r} of fixture {} can't be read".format(path, self.name))
+            content.update(inputHash.encode())
+        return content.hexdigest()
+
+    def __repr__(self):
+        return "<fixture {} ({} scope)>".format(self.name, self.scope)
+
+
+def fixturesOf(cls, scope=None):
+    """The names of the fixtures of a TestSuite class, optionally only those of `scope`."""
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if isinstance(value, Fixture) and (scope is None or value.scope == scope) and name not in names:
+                names.append(name)
+    return names
+
+def tearDown(values):
+    """
+    Resumes the generators of the fixtures in `values`, newest first, and
+    forgets them. Raises the first error after tearing down all of them.
+    """
+    errors = []
+    for fixture in reversed(list(values)):
+        _, generator = values.pop(fixture)
+        if generator is None:
+            continue
+        try:
+            next(generator)
+        except StopIteration:
+            pass
+        except Exception as error:
+            errors.append(error)
+    if errors:
+        raise errors[0]
+
+def forgetInherited():
+    """
+    Called in a new worker process: forgets the process scoped fixtures
+    inherited from the parent, and leaves tearing down the session scoped
+    ones to the parent.
+    """
+    for fixture in list(_shared):
+        if fixture.scope == "process":
+            del _shared[fixture]
+        else:
+            _shared[fixture] = (_shared[fixture][0], None)
+
+atexit.register(lambda: tearDown(_shared))
@@ -0,0 +1,103 @@
+"""
+Measures the memory that code allocates with tracemalloc, for the
+trace_memory mode of TestSuite.run and the toAllocateLessThan
+expectation of Expect.
+"""
+
+import contextlib
+import tracemalloc
+
+# allocations of the measuring itself, left out of the allocation sites.
+_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, contextlib.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"))
+
+# [traced bytes at the start, highest peak seen] of the open traces, innermost last.
+_open = []
+
+
+class MemoryUsage:
+    """
+    The bytes allocated by traced code: `peak` is the most allocated at once,
+    `net` what was still allocated at the end. `sites` are the lines that
+    allocated most of the `net` bytes, as ("file:line", bytes, blocks).
+    Displays as e.g. "peak 1.2 MB, net 12.0 kB, most at test.py:12".
+    """
+    __slots__ = ("peak", "net", "sites")
+
+    def __init__(self, peak=0, net=0, sites=()):
+        self.peak = peak
+        self.net = net
+        self.sites = sites
+
+    def __repr__(self):
+        text = "peak {}, net {}".format(formatBytes(self.peak), formatBytes(self.net))
+        if self.sites:
+            text += ", most at {}".format(self.sites[0][0])
+        return text
+
+
+@contextlib.contextmanager
+def trace(sites=0):
+    """
+    Context manager that measures the memory allocated in its block, and
+    fills in the MemoryUsage it returns on exit. Lists the `sites` lines
+    that allocated the most. Traces can be nested, and tracing that was
+    started outside of easytest is left running.
+    """
+    usage = MemoryUsage()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot() if sites and not started else None
+    current, peak = tracemalloc.get_traced_memory()
+    if _open:
+        # resetting the peak below hides it from the enclosing trace.
+        _open[-1][1] = max(_open[-1][1], peak)
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    # (before Python 3.9 a nested trace includes the peak of the enclosing one.)
+    frame = [current, current]
+    _open.append(frame)
+    try:
+        yield usage
+    finally:
+        _open.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        usage.net = current - frame[0]
+        usage.peak = max(frame[1], peak) - frame[0]
+        if sites:
+            usage.sites = _topSites(before, sites)
+        if started:
+            tracemalloc.stop()
+
+def measure(function, warmup=1):
+    """
+    Calls `function` `warmup` times, so one-time allocations like caches
+    are not counted, then returns the MemoryUsage of one more call.
+    """
+    for _ in range(warmup):
+        function()
+    with trace(sites=3) as usage:
+        function()
+    return usage
+
+def _topSites(before, limit):
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    if before is None:
+        statistics = [(stat.traceback[0], stat.size, stat.count) for stat in snapshot.statistics("lineno")]
+    else:
+        statistics = [(stat.traceback[0], stat.size_diff, stat.count_diff)
+                      for stat in snapshot.compare_to(before.filter_traces(_FILTERS), "lineno")]
+        statistics.sort(key=lambda stat: stat[1], reverse=True)
+    return [("{}:{}".format(frame.filename, frame.lineno), size, count)
+            for frame, size, count in statistics[:limit] if size > 0]
+
+
+def formatBytes(size):
+    for unit, scale in (("GB", 10**9), ("MB", 10**6), ("kB", 10**3)):
+        if abs(size) >= scale:
+            return "{:.1f} {}".format(size / scale, unit)
+    return "{} B".format(size)
@@ -0,0 +1,175 @@
+
+import contextvars
+
+class _Unpicklable:
+    """
+    Stands in for a queued object that cannot be sent between processes,
+    displaying the same way as the original did.
+    """
+    def __init__(self, obj):
+        self._repr = repr(obj)
+        self._str = str(obj)
+
+    def __repr__(self):
+        return self._repr
+
+    def __str__(self):
+        return self._str
+
+def _picklable(obj):
+    import pickle
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return _Unpicklable(obj)
+    return obj
+
+class _Context:
+    """
+    The messages queued in one context (test). Only created once the
+    context has a description or something to report, and the queues
+    only once something is queued in them.
+    """
+    __slots__ = ("description", "errors", "expectations")
+
+    def __init__(self):
+        self.description = None
+        self.errors = None
+        self.expectations = None
+
+    def __bool__(self):
+        return bool(self.errors or self.expectations)
+
+
+class _MessageHandler:
+    def __init__(self):
+        # the current context lives in a context variable so that tests
+        # running concurrently as asyncio tasks each have their own.
+        self._context = contextvars.ContextVar("context", default=None)
+        # dicts keep insertion order, so when displaying messages the
+        # contexts are in the same order every time you run the program.
+        # A context maps to None until it needs a _Context, which most
+        # passing tests never do. None is default global context.
+        self.contexts = {None: None}
+        # the contexts that queued an error or expectation, in order. A dict
+        # used as an ordered set, so dropping one doesn't scan all the others.
+        self.failed = {}
+        # the Snapshots.SnapshotStore of the running suite, for Expect.toMatchSnapshot.
+        self.snapshots = None
+        # the cacheDir of the running suite, where Expect.toNotRegressAgainst keeps its baselines.
+        self.cacheDir = ".easytest_cache"
+
+    def setContext(self, context):
+        if context not in self.contexts:
+            self.contexts[context] = None
+        self._context.set(context)
+
+    @property
+    def context(self):
+        return self._context.get()
+
+    def __getstate__(self):
+        # context variables can't be pickled, send the current value instead.
+        state = self.__dict__.copy()
+        state["_context"] = self.context
+        return state
+
+    def __setstate__(self, state):
+        context = state.pop("_context")
+        self.__dict__.update(state)
+        self._context = contextvars.ContextVar("context", default=None)
+        self._context.set(context)
+
+    def _current(self):
+        """The _Context of the current context, created if needed."""
+        name = self.context
+        if name not in self.contexts:
+            raise KeyError("Could not find context {}".format(name))
+        context = self.contexts[name]
+        if context is None:
+            context = self.contexts[name] = _Context()
+        return context
+
+    def _queue(self, context, queueName, message):
+        queue = getattr(context, queueName)
+        if queue is None:
+            if not context:
+                self.failed[self.context] = None
+            queue = []
+            setattr(context, queueName, queue)
+        queue.append(message)
+
+    def setDescription(self, description):
+        self._current().description = description
+
+    def queueError(self, error, traceback=None, errorType=None):
+        """Adds an appropriate error message to message queue, by default named after the type of `error`."""
+        self._queue(self._current(), "errors", (errorType or type(error).__name__, error, traceback))
+
+    def queueExpectation(self, expected, received, phrase=""):
+        self._queue(self._current(), "expectations", (expected, received, phrase))
+
+    def exportContext(self, contextName):
+        """
+        Removes a context and returns it in a form that can be
+        sent to another process and merged with mergeContext.
+        """
+        context = self.contexts.pop(contextName)
+        self.failed.pop(contextName, None)
+        if context is None:
+            return None
+        exported = _Context()
+        exported.description = context.description
+        if context.errors:
+            exported.errors = [(errorType, _picklable(error), traceback)
+                               for errorType, error, traceback in context.errors]
+        if context.expectations:
+            exported.expectations = [(_picklable(expected), _picklable(received), phrase)
+                                     for expected, received, phrase in context.expectations]
+        return exported
+
+    def mergeContext(self, contextName, context):
+        """Adds the messages of an exported context to the context with the same name."""
+        self.setContext(contextName)
+        if context is None:
+            return
+        ownContext = self._current()
+        for error in context.errors or ():
+            self._queue(ownContext, "errors", error)
+        for expectation in context.expectations or ():
+            self._queue(ownContext, "expectations", expectation)
+        if context.description:
+            ownContext.description = context.description
+
+    def messages(self, contextName):
+        """Returns the (description, expectations, errors) of a context without dropping them."""
+        context = self.contexts.get(contextName)
+        if context is None:
+            return None, (), ()
+        return context.description, context.expectations or (), context.errors or ()
+
+    def popAll(self, reporter=None):
+        """
+        Hands the queued messages of every context to the reporter (a
+        ColorReporter if none is given) in context order, then drops them.
+        """
+        if reporter is None:
+            from .Reporter import ColorReporter
+            reporter = ColorReporter()
+        # only the failed contexts have messages, but they may have failed out of order.
+        failed = list(self.failed)
+        if len(failed) > 1:
+            position = {name: index for index, name in enumerate(self.contexts)}
+            failed.sort(key=position.get)
+        for name in failed:
+            self.popContext(name, reporter)
+
+    def popContext(self, contextName, reporter):
+        """Hands the queued messages of one context to the reporter, then drops them."""
+        context = self.contexts[contextName]
+        if context:
+            reporter.onFailureReport(contextName, context.description,
+                                     context.expectations or (), context.errors or ())
+            context.expectations = None
+            context.errors = None
+            del self.failed[contextName]
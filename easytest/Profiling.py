@@ -0,0 +1,192 @@
+"""
+Profiles the tests of a suite for the profile option of TestSuite.run,
+either deterministically with cProfile or by sampling the stack with
+SIGPROF. Only the test methods are profiled, not beforeEach, afterEach
+or the reporting: the profile files only hold the calls made by the
+tests, and frames of easytest itself are left out of the hotspot tables.
+"""
+
+import os
+from collections import Counter
+
+MODES = ("cprofile", "sample")
+
+# seconds of CPU time between two samples of the sampling profiler.
+sampleInterval = 0.001
+
+# modules whose frames are easytest's overhead rather than the test's.
+_FRAMEWORK_MODULES = {"Easytest", "ColorPrint", "MessageHandler", "Reporter", "Profiling", "contextlib"}
+
+def _isFramework(filename):
+    return os.path.splitext(os.path.basename(filename))[0] in _FRAMEWORK_MODULES
+
+
+class Hotspot:
+    """
+    A function and the time spent in it, in nanoseconds: `selfTime` in the
+    function itself and `totalTime` including what it called. `calls` is
+    None for sampled profiles, which don't count calls.
+    """
+    __slots__ = ("function", "calls", "selfTime", "totalTime")
+
+    def __init__(self, function, calls, selfTime, totalTime):
+        self.function = function
+        self.calls = calls
+        self.selfTime = selfTime
+        self.totalTime = totalTime
+
+    def __repr__(self):
+        return "Hotspot({!r}, calls={}, selfTime={}ns, totalTime={}ns)".format(
+            self.function, self.calls, self.selfTime, self.totalTime)
+
+
+class Recording:
+    """
+    Profiles the code between start() and stop(). A sampled recording
+    only records the frames below `boundary`, the frame that runs the test,
+    and a cProfile recording only the calls below the function `root`,
+    the test, given as its (filename, line, name).
+    """
+    def __init__(self, mode, boundary=None, root=None):
+        self.mode = mode
+        self.boundary = boundary
+        self.root = root
+        self._profiler = None
+        self._stacks = Counter()
+        self._previous = None
+
+    def start(self):
+        if self.mode == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+            return
+        import signal
+        self._previous = signal.signal(signal.SIGPROF, self._onSample)
+        signal.setitimer(signal.ITIMER_PROF, sampleInterval, sampleInterval)
+
+    def stop(self):
+        """Stops profiling and returns the raw profile, for Profile.add."""
+        if self.mode == "cprofile":
+            self._profiler.disable()
+            self._profiler.create_stats()
+            if self.root is None:
+                return self._profiler.stats
+            return _calledFrom(self._profiler.stats, self.root)
+        import signal
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, self._previous)
+        return self._stacks
+
+    def _onSample(self, signalNumber, frame):
+        stack = []
+        while frame is not None and frame is not self.boundary:
+            if not _isFramework(frame.f_code.co_filename):
+                stack.append(_frameName(frame.f_code.co_filename, frame.f_code.co_firstlineno, frame.f_code.co_name))
+            frame = frame.f_back
+        if stack:
+            self._stacks[tuple(reversed(stack))] += 1
+
+
+class Profile:
+    """
+    The profile of a whole run, to which the raw profile of every test is
+    added. Written to a pstats file for cProfile, which e.g. snakeviz or
+    gprof2dot read, and to a file of collapsed stacks for sampling, which
+    flamegraph.pl and speedscope read.
+    """
+    def __init__(self, mode):
+        if mode not in MODES:
+            raise ValueError("profile must be one of {}, not {!r}".format(MODES, mode))
+        self.mode = mode
+        self._stats = None
+        # collapsed stacks, with the name of the test as the root frame.
+        self._stacks = Counter()
+
+    def add(self, name, raw):
+        """Adds the raw profile of test `name` and returns the hotspots of that test."""
+        if self.mode == "cprofile":
+            stats = _statsFrom(raw)
+            if self._stats is None:
+                self._stats = _statsFrom({})
+            self._stats.add(stats)
+            return _statHotspots(stats.stats)
+        for stack, samples in raw.items():
+            self._stacks[(name,) + stack] += samples
+        return _sampleHotspots(raw)
+
+    def hotspots(self, limit=10):
+        """The `limit` functions of the whole run with the most self time."""
+        if self.mode == "cprofile":
+            return _statHotspots(self._stats.stats, limit) if self._stats is not None else []
+        stacks = Counter()
+        for stack, samples in self._stacks.items():
+            stacks[stack[1:]] += samples # without the test
+        return _sampleHotspots(stacks, limit)
+
+    def write(self, directory, suiteId):
+        """Writes the profile to `directory` and returns the path of the file."""
+        os.makedirs(directory, exist_ok=True)
+        if self.mode == "cprofile":
+            path = os.path.join(directory, suiteId + ".pstats")
+            (self._stats or _statsFrom({})).dump_stats(path)
+            return path
+        path = os.path.join(directory, suiteId + ".folded")
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, samples in sorted(self._stacks.items()):
+                file.write("{} {}\n".format(";".join(stack), samples))
+        return path
+
+
+def _statsFrom(raw):
+    import pstats
+    stats = pstats.Stats()
+    stats.stats = raw
+    stats.get_top_level_stats()
+    return stats
+
+def _calledFrom(raw, root):
+    """
+    The raw cProfile stats of `root` and the functions it called, directly
+    or not, without the calls from outside of them, like those of easytest
+    running the test. `root` is then the top of the call graph.
+    """
+    called = {}
+    for function, (*_, callers) in raw.items():
+        for caller in callers:
+            called.setdefault(caller, []).append(function)
+    kept = {root} if root in raw else set()
+    pending = list(kept)
+    while pending:
+        for function in called.get(pending.pop(), ()):
+            if function not in kept:
+                kept.add(function)
+                pending.append(function)
+    return {function: raw[function][:4] + ({caller: timing for caller, timing in raw[function][4].items()
+                                             if caller in kept},)
+            for function in kept}
+
+def _statHotspots(raw, limit=5):
+    hotspots = [Hotspot(_frameName(filename, line, function), calls, int(selfTime * 10**9), int(totalTime * 10**9))
+                for (filename, line, function), (_, calls, selfTime, totalTime, _) in raw.items()
+                if not _isFramework(filename) and "_lsprof.Profiler" not in function]
+    hotspots.sort(key=lambda hotspot: hotspot.selfTime, reverse=True)
+    return hotspots[:limit] if limit else hotspots
+
+def _sampleHotspots(stacks, limit=5):
+    selfSamples = Counter()
+    totalSamples = Counter()
+    for stack, samples in stacks.items():
+        selfSamples[stack[-1]] += samples
+        for function in set(stack):
+            totalSamples[function] += samples
+    interval = int(sampleInterval * 10**9)
+    hotspots = [Hotspot(function, None, selfSamples[function] * interval, samples * interval)
+                for function, samples in totalSamples.items()]
+    hotspots.sort(key=lambda hotspot: (hotspot.selfTime, hotspot.totalTime), reverse=True)
+    return hotspots[:limit] if limit else hotspots
+
+def _frameName(filename, line, function):
+    if filename == "~": # built-in functions
+        return function
+    return "{} ({}:{})".format(function, os.path.basename(filename), line)
@@ -0,0 +1,330 @@
+from .ColorPrint import ColorPrint
+
+class Reporter:
+    """
+    Receives events from a running TestSuite. Every event does nothing by
+    default, so a reporter only needs to override the ones it cares about.
+    Pass an instance to the TestSuite: `MySuite(reporter=MyReporter())`.
+    """
+    def onSuiteStart(self, suite):
+        """Called once before the first test runs."""
+        pass
+
+    def onTestStart(self, name):
+        """Called when a test starts running in this process."""
+        pass
+
+    def onTestPass(self, name):
+        pass
+
+    def onTestFail(self, name):
+        pass
+
+    def onTestResult(self, result, description, expectations, errors):
+        """
+        Called when a test has finished, after onTestPass or onTestFail, with its
+        TestResult and the messages queued in the test so far (see onFailureReport).
+        """
+        pass
+
+    def onFailureReport(self, name, description, expectations, errors):
+        """
+        Called after all tests have run, once for every test with queued messages,
+        in test order. `expectations` holds (expected, received, phrase) tuples and
+        `errors` holds (errorType, error, traceback) tuples.
+        """
+        pass
+
+    def onSummary(self, suite):
+        """Called last, when `suite._status` and `suite._run_time` are complete."""
+        pass
+
+
+class QuietReporter(Reporter):
+    """
+    Displays nothing and formats nothing, for when only the
+    exit code and `_status` of the suite are of interest.
+    """
+    pass
+
+
+class ColorReporter(Reporter):
+    """
+    The default reporter, displays colored output in the terminal.
+    Expected and received values are shortened to `maxLength` characters.
+    The summary lists the `slowest` slowest tests, set it to 0 to not list any,
+    and in trace_memory runs the `heaviest` tests that allocated the most.
+    Profiled runs list the `hotspots` functions that took the most time.
+    """
+    def __init__(self, maxLength=None, slowest=5, heaviest=5, hotspots=10):
+        self.maxLength = maxLength
+        self.slowest = slowest
+        self.heaviest = heaviest
+        self.hotspots = hotspots
+
+    def onTestStart(self, name):
+        if ColorPrint.isatty(): # a transient line is just noise in a log.
+            ColorPrint.warn(" RUNS ", end="", background=True)
+            ColorPrint.white(" {}".format(name), end="\r")
+
+    def onTestPass(self, name):
+        ColorPrint.green(" PASS ",end="", background=True)
+        ColorPrint.green(" {}".format(name))
+
+    def onTestFail(self, name):
+        ColorPrint.fail(" FAIL ",end="", background=True)
+        ColorPrint.white(" {}".format(name))
+
+    def onFailureReport(self, name, description, expectations, errors):
+        ColorPrint.white(" In test {}:".format(name))
+        if description:
+            ColorPrint.info("  {}".format(description))
+        if expectations:
+            from .helpers.shortrepr import shortrepr
+            ColorPrint.white("  ",end="")
+            ColorPrint.fail(" EXPECTATION ",background=True)
+            for expected, received, phrase in expectations:
+                ColorPrint.white("\tExpected {}:".format(phrase))
+                ColorPrint.green("\t\t{}".format(shortrepr(expected, self.maxLength)))
+                ColorPrint.white("\tBut received:")
+                ColorPrint.fail("\t\t{}".format(shortrepr(received, self.maxLength)))
+        if errors:
+            ColorPrint.white("  ",end="")
+            ColorPrint.fail(" ERROR ",background=True)
+            for errorType, errorMsg, traceback in errors:
+                # print error type with hard background.
+                ColorPrint.fail("\t{}:".format(errorType), end="")
+                # print error message with no background.
+                ColorPrint.fail(" {}".format(errorMsg))
+                for line in traceback:
+                    ColorPrint.fail("  {}".format(line))
+
+    def onSummary(self, suite):
+        print()
+        if self.slowest and suite._status:
+            self._printSlowest(suite)
+        if self.heaviest and suite._traceMemory and suite._status:
+            self._printHeaviest(suite)
+        if suite._profile is not None:
+            self._printHotspots(suite)
+        if suite._notRunCause == "beforeAll":
+            ColorPrint.fail("beforeAll failed, {} tests were not run".format(len(suite._notRun)))
+        elif suite._notRun:
+            ColorPrint.fail("Stopped after {} failed tests, {} tests were not run".format(
+                len(suite._failed), len(suite._notRun)))
+        snapshots = suite._snapshots
+        if snapshots is not None and (snapshots.added or snapshots.updated):
+            ColorPrint.info("Wrote {} new and replaced {} snapshots in {}".format(
+                snapshots.added, snapshots.updated, snapshots.path))
+        if suite._skipped:
+            ColorPrint.info("Skipped {} tests not affected by any change".format(len(suite._skipped)))
+        ColorPrint.info("Ran all tests in {} seconds".format(suite._run_time))
+
+    def _printSlowest(self, suite):
+        from statistics import median
+        results = sorted(suite._status.values(), key=lambda result: result.duration, reverse=True)
+        ColorPrint.white(" Slowest tests:")
+        for result in results[:self.slowest]:
+            ColorPrint.white("  {:>9} {}".format(_formatDuration(result.duration), result.name), end="")
+            ColorPrint.white(" (beforeEach {}, test {}, afterEach {})".format(_formatDuration(result.beforeEachTime),
+                _formatDuration(result.testTime), _formatDuration(result.afterEachTime)), end="")
+            history = suite._timingHistory.get(result.name)
+            if history:
+                change = result.duration / max(median(history), 1) - 1
+                colored = ColorPrint.fail if change > 0.1 else ColorPrint.white
+                colored(" {:+.0%} compared to earlier runs".format(change), end="")
+            print()
+
+    def _printHeaviest(self, suite):
+        from .Memory import formatBytes
+        results = sorted((result for result in suite._status.values() if result.memory is not None),
+                         key=lambda result: result.memory.peak, reverse=True)
+        ColorPrint.white(" Most allocating tests:")
+        for result in results[:self.heaviest]:
+            ColorPrint.white("  {:>9} {} (net {})".format(formatBytes(result.memory.peak), result.name,
+                formatBytes(result.memory.net)))
+            for site, size, count in result.memory.sites:
+                ColorPrint.white("  {:>9}   {} ({} blocks)".format(formatBytes(size), site, count))
+
+    def _printHotspots(self, suite):
+        if self.hotspots:
+            ColorPrint.white(" Hotspots of all tests (self time, total time, calls):")
+            for hotspot in suite._profile.hotspots(self.hotspots):
+                ColorPrint.white(_formatHotspot(hotspot))
+            # the hotspots of the slowest tests, where speeding up helps the most.
+            results = sorted((result for result in suite._status.values() if result.profile),
+                             key=lambda result: result.duration, reverse=True)
+            for result in results[:self.slowest]:
+                ColorPrint.white(" Hotspots of {}:".format(result.name))
+                for hotspot in result.profile[:3]:
+                    ColorPrint.white(_formatHotspot(hotspot))
+        ColorPrint.info("Wrote the profile to {}".format(suite._profilePath))
+
+def _formatHotspot(hotspot):
+    calls = "" if hotspot.calls is None else str(hotspot.calls)
+    return "  {:>9} {:>9} {:>7}  {}".format(_formatDuration(hotspot.selfTime), _formatDuration(hotspot.totalTime),
+                                           calls, hotspot.function)
+
+def _formatDuration(nanoseconds):
+    if nanoseconds >= 10**9:
+        return "{:.2f} s".format(nanoseconds / 10**9)
+    return "{:.1f} ms".format(nanoseconds / 10**6)
+
+
+class CombinedReporter(Reporter):
+    """
+    Passes every event on to several reporters, for example to display
+    results and write them to a file: `CombinedReporter(ColorReporter(), JsonLinesReporter(path))`.
+    """
+    def __init__(self, *reporters):
+        self.reporters = reporters
+
+    def onSuiteStart(self, suite):
+        for reporter in self.reporters:
+            reporter.onSuiteStart(suite)
+
+    def onTestStart(self, name):
+        for reporter in self.reporters:
+            reporter.onTestStart(name)
+
+    def onTestPass(self, name):
+        for reporter in self.reporters:
+            reporter.onTestPass(name)
+
+    def onTestFail(self, name):
+        for reporter in self.reporters:
+            reporter.onTestFail(name)
+
+    def onTestResult(self, result, description, expectations, errors):
+        for reporter in self.reporters:
+            reporter.onTestResult(result, description, expectations, errors)
+
+    def onFailureReport(self, name, description, expectations, errors):
+        for reporter in self.reporters:
+            reporter.onFailureReport(name, description, expectations, errors)
+
+    def onSummary(self, suite):
+        for reporter in self.reporters:
+            reporter.onSummary(suite)
+
+
+class JsonLinesReporter(Reporter):
+    """
+    Writes one JSON object per line to `path` as each test finishes, with
+    the name, status and durations of the test, the description from it(),
+    and the failed expectations and errors. The file is flushed after every
+    line, so it can be followed while the suite is running. Set `append`
+    to add to an existing file, e.g. when several suites write to one file.
+    """
+    def __init__(self, path, append=False, maxLength=None):
+        self.path = path
+        self.append = append
+        self.maxLength = maxLength
+        self._file = None
+        self._suiteId = None
+
+    def onSuiteStart(self, suite):
+        self._file = open(self.path, "a" if self.append else "w", encoding="utf-8")
+        self._suiteId = suite._suiteId()
+
+    def onTestResult(self, result, description, expectations, errors):
+        import json
+        record = {"suite": self._suiteId, "name": result.name, "status": result.status,
+                  "duration": result.duration / 10**9, "beforeEachTime": result.beforeEachTime / 10**9,
+                  "testTime": result.testTime / 10**9, "afterEachTime": result.afterEachTime / 10**9,
+                  "peakMemory": result.memory.peak if result.memory is not None else None,
+                  "netMemory": result.memory.net if result.memory is not None else None,
+                  "description": description,
+                  "expectations": [_expectationRecord(expectation, self.maxLength) for expectation in expectations],
+                  "errors": [_errorRecord(error) for error in errors]}
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def onSummary(self, suite):
+        self._file.close()
+
+
+class JUnitXmlReporter(Reporter):
+    """
+    Writes the results as JUnit XML to `path` at the end of the run. The
+    test cases are streamed to `path`.partial as the tests finish, so the
+    report is not kept in memory; the complete file replaces `path` once
+    the totals for the <testsuite> element are known. Tests that were not
+    run (see TestSuite.summary) are written as skipped test cases.
+    """
+    def __init__(self, path, maxLength=None):
+        self.path = path
+        self.maxLength = maxLength
+        self._file = None
+        self._suiteId = None
+        self._counts = None
+
+    def onSuiteStart(self, suite):
+        self._file = open(self.path + ".partial", "w+", encoding="utf-8")
+        self._suiteId = suite._suiteId()
+        self._counts = {"tests": 0, "failures": 0, "errors": 0, "time": 0}
+
+    def onTestResult(self, result, description, expectations, errors):
+        from xml.sax.saxutils import quoteattr, escape
+        self._counts["tests"] += 1
+        self._counts["time"] += result.duration
+        if expectations:
+            self._counts["failures"] += 1
+        elif errors or result == "failed":
+            self._counts["errors"] += 1
+        write = self._file.write
+        write('  <testcase classname={} name={} time="{:.6f}"'.format(
+            quoteattr(self._suiteId), quoteattr(result.name), result.duration / 10**9))
+        if not (expectations or errors or description):
+            write('/>\n')
+            return
+        write('>\n')
+        for expectation in expectations:
+            record = _expectationRecord(expectation, self.maxLength)
+            write('    <failure message={}>{}</failure>\n'.format(quoteattr(_xmlText("Expected " + record["phrase"])),
+                escape(_xmlText("Expected {phrase}:\n\t{expected}\nBut received:\n\t{received}".format(**record)))))
+        for error in errors:
+            record = _errorRecord(error)
+            write('    <error type={} message={}>{}</error>\n'.format(quoteattr(record["type"]),
+                quoteattr(_xmlText(record["message"])), escape(_xmlText("".join(record["traceback"])))))
+        if description:
+            write('    <system-out>{}</system-out>\n'.format(escape(_xmlText(description))))
+        write('  </testcase>\n')
+
+    def onSummary(self, suite):
+        import os, shutil
+        from xml.sax.saxutils import quoteattr
+        counts = self._counts
+        skipped = [(name, "not affected by the changes since the last run") for name in suite._skipped]
+        notRun = "not run because beforeAll failed" if suite._notRunCause == "beforeAll" \
+                 else "not run after too many failures"
+        skipped += [(name, notRun) for name in suite._notRun]
+        with open(self.path + ".tmp", "w", encoding="utf-8") as file:
+            file.write('<?xml version="1.0" encoding="utf-8"?>\n<testsuites>\n')
+            file.write('<testsuite name={} tests="{}" failures="{}" errors="{}" skipped="{}" time="{:.6f}">\n'.format(
+                quoteattr(self._suiteId), counts["tests"] + len(skipped), counts["failures"], counts["errors"],
+                len(skipped), counts["time"] / 10**9))
+            self._file.seek(0)
+            shutil.copyfileobj(self._file, file)
+            for name, reason in skipped:
+                file.write('  <testcase classname={} name={} time="0.000000">\n    <skipped message={}/>\n'
+                           '  </testcase>\n'.format(quoteattr(self._suiteId), quoteattr(name), quoteattr(reason)))
+            file.write('</testsuite>\n</testsuites>\n')
+        self._file.close()
+        os.remove(self.path + ".partial")
+        os.replace(self.path + ".tmp", self.path)
+
+
+def _expectationRecord(expectation, maxLength):
+    from .helpers.shortrepr import shortrepr
+    expected, received, phrase = expectation
+    return {"phrase": phrase, "expected": shortrepr(expected, maxLength), "received": shortrepr(received, maxLength)}
+
+def _errorRecord(error):
+    errorType, errorMessage, traceback = error
+    return {"type": errorType, "message": str(errorMessage), "traceback": list(traceback or ())}
+
+def _xmlText(text):
+    # characters XML 1.0 can't contain at all, not even escaped.
+    return "".join(character for character in text
+                   if character >= " " or character in "\t\n\r")
@@ -0,0 +1,68 @@
+class TestResult:
+    """
+    The result of running one test. Compares equal to its status
+    ("passed" or "failed"), so `suite._status[name] == "passed"` works.
+    Durations are in nanoseconds. `dependencies` are the source files the
+    test executed, if they were tracked (see Dependencies.py). `memory` is
+    the Memory.MemoryUsage of the test in trace_memory runs, else None, and
+    `profile` the Profiling.Hotspots of the test in profiled runs. `snapshots`
+    are the snapshots the test wrote, until the suite saves them.
+    """
+    __slots__ = ("name", "status", "beforeEachTime", "testTime", "afterEachTime", "dependencies", "memory",
+                 "profile", "snapshots")
+
+    def __init__(self, name, status=None, beforeEachTime=0, testTime=0, afterEachTime=0, dependencies=None,
+                 memory=None, profile=None, snapshots=None):
+        self.name = name
+        self.status = status
+        self.beforeEachTime = beforeEachTime
+        self.testTime = testTime
+        self.afterEachTime = afterEachTime
+        self.dependencies = dependencies
+        self.memory = memory
+        self.profile = profile
+        self.snapshots = snapshots
+
+    @property
+    def duration(self):
+        """The total time of beforeEach, the test and afterEach."""
+        return self.beforeEachTime + self.testTime + self.afterEachTime
+
+    def __eq__(self, other):
+        if isinstance(other, TestResult):
+            return (self.name, self.status) == (other.name, other.status)
+        return self.status == other
+
+    def __hash__(self):
+        return hash(self.status)
+
+    def __repr__(self):
+        return "TestResult({!r}, {!r}, duration={}ns)".format(self.name, self.status, self.duration)
+
+
+class RunSummary:
+    """
+    Counts of the latest run of a suite, see TestSuite.summary.
+    `failedNames` are in the order the tests finished.
+    """
+    __slots__ = ("passed", "failedNames", "skipped", "notRun", "runTime")
+
+    def __init__(self, passed, failedNames, skipped=0, notRun=0, runTime=None):
+        self.passed = passed
+        self.failedNames = failedNames
+        self.skipped = skipped
+        self.notRun = notRun
+        self.runTime = runTime
+
+    @property
+    def failed(self):
+        return len(self.failedNames)
+
+    @property
+    def total(self):
+        """The number of tests that ran."""
+        return self.passed + self.failed
+
+    def __repr__(self):
+        return "RunSummary(passed={}, failed={}, skipped={}, notRun={})".format(
+            self.passed, self.failed, self.skipped, self.notRun)
@@ -0,0 +1,65 @@
+"""
+Orders and partitions tests using the durations recorded by earlier runs,
+so that parallel and sharded runs finish at about the same time.
+"""
+
+import heapq
+from statistics import median
+
+def expectedDurations(names, history):
+    """
+    Returns the expected duration of every test: the median of its earlier
+    durations, or for tests without history the median of the other tests.
+    """
+    known = {name: median(history[name]) for name in names if history.get(name)}
+    unknown = median(known.values()) if known else 1
+    return {name: known.get(name, unknown) for name in names}
+
+def longestFirst(names, history, first=()):
+    """
+    Returns the names ordered by expected duration, longest first, except
+    that the names in `first` come before all others. Ties keep their order.
+    """
+    durations = expectedDurations(names, history)
+    return sorted(names, key=lambda name: (name not in first, -durations[name]))
+
+def chunks(names, history, workers):
+    """
+    Splits the names, in their order, into chunks for `workers` workers.
+    Every chunk is expected to take at most a quarter of what is left for
+    each worker, so a long test gets a chunk of its own, the chunks get
+    smaller towards the end and the workers finish at about the same time.
+    Without history this is as many tests per chunk as the budget allows.
+    """
+    durations = expectedDurations(names, history)
+    remaining = sum(durations.values())
+    result = []
+    chunk, budget, spent = [], remaining / (workers * 4), 0
+    for name in names:
+        if chunk and spent + durations[name] > budget:
+            result.append(chunk)
+            chunk, budget, spent = [], remaining / (workers * 4), 0
+        chunk.append(name)
+        spent += durations[name]
+        remaining -= durations[name]
+    if chunk:
+        result.append(chunk)
+    return result
+
+def partition(names, history, total):
+    """
+    Splits the names into `total` shards of about the same expected duration,
+    giving the longest remaining test to the shard that has the least so far.
+    Every shard keeps the order of `names`. The result only depends on the
+    names and the history, so every machine computes the same shards.
+    """
+    durations = expectedDurations(names, history)
+    shards = [[] for _ in range(total)]
+    # (expected duration of shard, shard index)
+    heap = [(0, i) for i in range(total)]
+    for name in longestFirst(names, history):
+        duration, i = heapq.heappop(heap)
+        shards[i].append(name)
+        heapq.heappush(heap, (duration + durations[name], i))
+    order = {name: position for position, name in enumerate(names)}
+    return [sorted(shard, key=order.__getitem__) for shard in shards]
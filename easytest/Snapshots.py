@@ -0,0 +1,233 @@
+"""
+The snapshot store behind Expect.toMatchSnapshot. The snapshots of a
+suite are kept in one text file (see SnapshotStore for the format),
+meant to be committed next to the tests. Every snapshot is stored with
+a hash of its content, so a matching value is recognised by its hash
+without reading or comparing the stored snapshot, and an index of where
+each snapshot starts is cached, so only mismatching snapshots are read.
+"""
+
+import hashlib
+import json
+import os
+
+
+class SnapshotStore:
+    """
+    The snapshots of one suite, in the file at `path`. The file is a
+    sequence of records, each a header line and the snapshot as JSON:
+
+      ## reportTest 1 bytes=52 sha1=0beec7b5ea3f0fdbc95d0dd47f3c5bc275da8a33
+      {
+        "total": 2
+      }
+
+    The index of the records is cached in `cache` (a Cache, or None to
+    rebuild it from the headers every run). Snapshots written during a
+    run are saved in one batch by flush().
+    """
+    def __init__(self, path, cache=None, cacheKey=None, update=False):
+        self.path = path
+        self.cache = cache
+        self.cacheKey = cacheKey
+        self.update = update
+        self._index = None
+        # per test, the number of unnamed snapshots it has checked.
+        self._counters = {}
+        # per test, the records it wrote, until they are queued by the suite.
+        self._written = {}
+        # records to save by flush(), key -> text.
+        self._queued = {}
+        self.reads = 0 # number of stored snapshots read, i.e. that didn't match by hash
+        self.added = 0
+        self.updated = 0
+
+    def check(self, test, name, obj):
+        """
+        Compares `obj` to the snapshot `name` of `test`, by default the
+        next unnamed snapshot of the test. Returns (passes, key, expected, diff)
+        with the stored value and a SnapshotDiff if it doesn't match. A missing
+        snapshot, or a mismatching one when updating, is written instead.
+        """
+        if name is None:
+            self._counters[test] = self._counters.get(test, 0) + 1
+            name = str(self._counters[test])
+        key = "{} {}".format(test, name)
+        if "\n" in key:
+            raise ValueError("snapshot names can't contain newlines: {!r}".format(key))
+        text = serialize(obj)
+        entry = self.index().get(key)
+        if entry is not None and entry[2] == _hash(text):
+            return True, key, None, None
+        if entry is None or self.update:
+            self._written.setdefault(test, []).append((key, text))
+            return True, key, None, None
+        expected = json.loads(self._read(entry))
+        return False, key, expected, SnapshotDiff(expected, json.loads(text))
+
+    def takeWritten(self, test):
+        """The records `test` wrote, to queue in this (or the parent process') store."""
+        return self._written.pop(test, None)
+
+    def queue(self, records):
+        for key, text in records:
+            if key in self.index():
+                self.updated += 1
+            else:
+                self.added += 1
+            self._queued[key] = text
+
+    def flush(self):
+        """Saves the queued records in one write: appended if all are new, else by rewriting the file."""
+        if not self._queued:
+            return
+        index = self.index()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if not any(key in index for key in self._queued):
+            offset = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+            chunk, entries = _records(self._queued.items(), offset)
+            with open(self.path, "ab") as file:
+                file.write(chunk)
+            index.update(entries)
+        else:
+            records = []
+            with open(self.path, "rb") as file:
+                for key, entry in index.items(): # updated snapshots keep their place
+                    if key not in self._queued:
+                        file.seek(entry[0])
+                        records.append((key, file.read(entry[1]).decode("utf-8")))
+                    else:
+                        records.append((key, self._queued.pop(key)))
+            records.extend(self._queued.items())
+            chunk, index = _records(records, 0)
+            temporary = "{}.{}.tmp".format(self.path, os.getpid())
+            with open(temporary, "wb") as file:
+                file.write(chunk)
+            os.replace(temporary, self.path)
+        self._queued = {}
+        self._index = index
+        self._saveIndex()
+
+    def index(self):
+        """{key: [offset, bytes, sha1]} of the stored snapshots, loaded on first use."""
+        if self._index is None:
+            self._index = self._loadIndex()
+        return self._index
+
+    def _loadIndex(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return {}
+        if self.cache is not None:
+            cached = self.cache.get(self.cacheKey)
+            if cached is not None and cached["file"] == [stat.st_mtime_ns, stat.st_size]:
+                return cached["entries"]
+        index = {}
+        # only the headers are read, the snapshots are skipped.
+        with open(self.path, "rb") as file:
+            for header in iter(file.readline, b""):
+                key, size, sha1 = _parseHeader(header.decode("utf-8"))
+                index[key] = [file.tell(), size, sha1]
+                file.seek(size + 1, os.SEEK_CUR)
+        self._index = index
+        self._saveIndex()
+        return index
+
+    def _saveIndex(self):
+        if self.cache is not None:
+            stat = os.stat(self.path)
+            self.cache.set(self.cacheKey, {"file": [stat.st_mtime_ns, stat.st_size], "entries": self._index})
+
+    def _read(self, entry):
+        self.reads += 1
+        with open(self.path, "rb") as file:
+            file.seek(entry[0])
+            return file.read(entry[1]).decode("utf-8")
+
+
+class SnapshotDiff:
+    """
+    The differences between a stored snapshot and a received value, as
+    (path, description). Displays as e.g. "1 difference: ['users'][0]['name']:
+    'Rob' instead of 'Bob'", listing at most `limit` differences.
+    """
+    __slots__ = ("differences", "limit")
+
+    def __init__(self, expected, received, limit=10):
+        self.differences = list(_differences(expected, received, ""))
+        self.limit = limit
+
+    def __repr__(self):
+        count = len(self.differences)
+        lines = ["{}: {}".format(path or "the value", description)
+                 for path, description in self.differences[:self.limit]]
+        if count > self.limit:
+            lines.append("and {} more".format(count - self.limit))
+        return "{} difference{}: {}".format(count, "" if count == 1 else "s", "; ".join(lines))
+
+
+def serialize(obj):
+    """
+    The text a value is stored as: indented JSON with sorted keys. Values
+    JSON doesn't have are converted (see _plain), so e.g. a tuple matches
+    the list with the same items.
+    """
+    return json.dumps(_plain(obj), indent=2, sort_keys=True, ensure_ascii=False)
+
+def _plain(obj):
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, dict):
+        return {key if isinstance(key, str) else repr(key): _plain(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plain(item) for item in obj]
+    if isinstance(obj, (set, frozenset)):
+        return sorted((_plain(item) for item in obj), key=repr)
+    if hasattr(obj, "tolist"): # numpy arrays and scalars
+        return _plain(obj.tolist())
+    if hasattr(obj, "__dict__"):
+        plain = {"__class__": type(obj).__qualname__}
+        plain.update((key, _plain(value)) for key, value in vars(obj).items())
+        return plain
+    return repr(obj)
+
+def _differences(expected, received, path):
+    from .helpers.shortrepr import shortrepr
+    if isinstance(expected, dict) and isinstance(received, dict):
+        for key in sorted(expected.keys() - received.keys()):
+            yield "{}[{!r}]".format(path, key), "missing"
+        for key in sorted(received.keys() - expected.keys()):
+            yield "{}[{!r}]".format(path, key), "unexpected {}".format(shortrepr(received[key], 60))
+        for key in sorted(expected.keys() & received.keys()):
+            yield from _differences(expected[key], received[key], "{}[{!r}]".format(path, key))
+    elif isinstance(expected, list) and isinstance(received, list):
+        if len(expected) != len(received):
+            yield path, "length {} instead of {}".format(len(received), len(expected))
+        for index, (expectedItem, receivedItem) in enumerate(zip(expected, received)):
+            yield from _differences(expectedItem, receivedItem, "{}[{}]".format(path, index))
+    elif expected != received:
+        yield path, "{} instead of {}".format(shortrepr(received, 60), shortrepr(expected, 60))
+
+def _records(records, offset):
+    """The bytes of `records` (key, text), and their index when written at `offset`."""
+    chunks = []
+    index = {}
+    for key, text in records:
+        data = text.encode("utf-8")
+        sha1 = _hash(text)
+        header = "## {} bytes={} sha1={}\n".format(key, len(data), sha1).encode("utf-8")
+        offset += len(header)
+        index[key] = [offset, len(data), sha1]
+        chunks += [header, data, b"\n"]
+        offset += len(data) + 1
+    return b"".join(chunks), index
+
+def _parseHeader(header):
+    if not header.startswith("## "):
+        raise ValueError("not a snapshot header: {!r}".format(header))
+    key, size, sha1 = header[3:].rstrip("\r\n").rsplit(" ", 2)
+    return key, int(size[len("bytes="):]), sha1[len("sha1="):]
+
+def _hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,235 @@
+"""
+The watch mode of the easytest command (easytest --watch): keeps one
+process running, and whenever a .py file below the watched paths
+changes, reloads the changed modules and reruns only the affected tests.
+
+Which tests are affected comes from the dependencies that incremental
+runs record (see Dependencies.py): the tests that executed a changed
+file, the tests that failed last time, and in a changed test file only
+the test methods that were edited, unless code outside of them changed.
+"""
+
+import ast
+import fnmatch
+import hashlib
+import importlib
+import os
+import sys
+import time
+
+from .Cache import Cache
+from .ColorPrint import ColorPrint
+
+# the modules of easytest itself, never reloaded since the suites subclass their classes.
+_FRAMEWORK_MODULES = {"easytest", "Easytest"}
+
+# before Python 3.9, modules imported through a relative entry of sys.path, like
+# the script run as __main__, have a __file__ relative to the directory started in.
+_startDirectory = os.getcwd()
+
+
+class Watch:
+    """
+    Runs the suites in the test files below `paths` once, then polls the
+    .py files below `paths` every `interval` seconds and reruns the tests
+    affected by the changes. `options` are passed on to TestSuite.run, and
+    suites with a cacheDir always run incrementally.
+    """
+    def __init__(self, paths, pattern="*.test.py", options=None, interval=0.5):
+        from .Discovery import Discovery
+        from .Easytest import TestSuite
+        self.paths = paths
+        self.pattern = pattern
+        self.options = dict(options or {})
+        self.interval = interval
+        self.discovery = Discovery(TestSuite.cacheDir)
+        self._roots = tuple(os.path.join(os.path.abspath(path), "") if os.path.isdir(path)
+                            else os.path.abspath(path) for path in paths)
+        self._files = self._snapshot()
+        # per test file: (hash of the code outside of the test methods, {"Class.methodTest": hash}).
+        self._shapes = {}
+        # changes that couldn't be reloaded yet, retried with the next change.
+        self._pending = set()
+        # the modules reloaded for the latest change.
+        self._reloaded = set()
+
+    def loop(self):
+        """Runs until interrupted with Ctrl+C. Returns the exit code."""
+        self.rerun()
+        try:
+            while True:
+                ColorPrint.info("Watching for changes, press Ctrl+C to stop.")
+                changed = self.poll()
+                while not changed:
+                    time.sleep(self.interval)
+                    changed = self.poll()
+                print()
+                ColorPrint.info("Changed: {}".format(", ".join(sorted(os.path.relpath(path) for path in changed))))
+                self.rerun(changed)
+        except KeyboardInterrupt:
+            return 0
+
+    def poll(self):
+        """Returns the absolute paths of the .py files added, changed or deleted since the last poll."""
+        files = self._snapshot()
+        changed = {path for path in files.keys() | self._files.keys() if files.get(path) != self._files.get(path)}
+        self._files = files
+        return changed
+
+    def rerun(self, changed=None):
+        """
+        Reloads the modules of the `changed` files and runs the affected
+        tests, or runs all suites incrementally if `changed` is None.
+        Returns {(path, className): names of the tests run, None for all}.
+        """
+        from .Discovery import findTestFiles, loadSuite
+        changed = None if changed is None else set(changed) | self._pending
+        try:
+            if changed is not None:
+                self._reload(changed)
+            suites = self.discovery.discover(findTestFiles(self.paths, self.pattern))
+        except Exception:
+            import traceback
+            ColorPrint.fail(traceback.format_exc())
+            self._pending = changed or set()
+            return {}
+        self._pending = set()
+        for path, error in self.discovery.errors:
+            ColorPrint.info(path)
+            ColorPrint.fail(error)
+        ran = {}
+        for path, className in suites:
+            names = None
+            try:
+                suite = loadSuite(path, className)(exit_gracefully=True)
+                names = None if changed is None else self._affected(suite, os.path.abspath(path), changed)
+                if names is not None and not names:
+                    continue
+                ColorPrint.info("{} {}".format(path, className))
+                options = dict(self.options, incremental=suite.cacheDir is not None)
+                if names is not None:
+                    options["only"] = names
+                try:
+                    suite.run(**options)
+                except SystemExit:
+                    pass # run exits after failures, even with exit_gracefully
+            except Exception:
+                import traceback
+                ColorPrint.fail(traceback.format_exc()) # the other suites still run
+            ran[(path, className)] = names
+        for path in {os.path.abspath(path) for path, _ in suites}:
+            if path not in self._shapes or changed is not None and path in changed:
+                self._shapes[path] = _testFileShape(path)
+        return ran
+
+    def _affected(self, suite, path, changed):
+        """
+        The names of the tests of `suite` from the test file `path` that
+        the `changed` files affect, or None if all of them are.
+        """
+        cls = type(suite)
+        if suite.cacheDir is None:
+            # no recorded dependencies, so rerun the suite if its file changed or it imports a changed module.
+            return None if path in changed or sys.modules[cls.__module__] in self._reloaded else []
+        from .Dependencies import DependencyMap
+        names = set()
+        if path in changed:
+            shape = _testFileShape(path)
+            previous = self._shapes.get(path)
+            if previous is None or shape[0] != previous[0]:
+                return None # code outside the test methods changed, like a helper function
+            names.update(name.split(".")[1] for name, method in shape[1].items()
+                         if name.split(".")[0] == cls.__name__ and method != previous[1].get(name))
+        dependencyMap = DependencyMap(Cache(suite.cacheDir), "dependencies/" + suite._suiteId())
+        recorded = {name.split("[")[0] for name in dependencyMap.tests}
+        others = changed - {path} # a change to the test file itself is handled above
+        names.update(test.__name__ for test in suite._tests if test.__name__ not in recorded)
+        names.update(dependencyMap.failed)
+        names.update(name for name, files in dependencyMap.tests.items()
+                     if any(os.path.abspath(file) in others for file in files))
+        return names
+
+    def _reload(self, changed):
+        """Reloads the project modules of the `changed` files, and the project modules that use them."""
+        from .Discovery import loadModule
+        modules = {name: module for name, module in list(sys.modules.items()) if self._isProjectModule(name, module)}
+        reload = [name for name, module in modules.items() if _modulePath(module) in changed]
+        # a module that imported a reloaded module, or something from it, holds on to the old objects.
+        index = 0
+        while index < len(reload):
+            reloaded = reload[index]
+            for name, module in modules.items():
+                if name not in reload and _uses(module, reloaded, modules[reloaded]):
+                    reload.append(name)
+            index += 1
+        self._reloaded = set()
+        for name in reload:
+            module = modules[name]
+            path = _modulePath(module)
+            if not os.path.exists(path):
+                del sys.modules[name] # the file was deleted
+                continue
+            if fnmatch.fnmatch(os.path.basename(path), self.pattern):
+                # test files are loaded from their path, which reload can't find again.
+                del sys.modules[name]
+                module = loadModule(path)
+            else:
+                module = importlib.reload(module)
+            self._reloaded.add(module)
+
+    def _isProjectModule(self, name, module):
+        # the script that was started can't be reloaded, and easytest looks it up by name.
+        if name in ("__main__", "__mp_main__") or getattr(module, "__file__", None) is None:
+            return False
+        path = _modulePath(module)
+        return (name.split(".")[0] not in _FRAMEWORK_MODULES
+                and path.startswith(self._roots) and "site-packages" not in path)
+
+    def _snapshot(self):
+        from .Discovery import findTestFiles
+        files = {}
+        for path in findTestFiles(self.paths, "*.py"):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue # deleted while walking
+            files[os.path.abspath(path)] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+
+def _modulePath(module):
+    """The absolute path of the file of `module`."""
+    return os.path.normpath(os.path.join(_startDirectory, module.__file__))
+
+def _uses(module, name, used):
+    """Whether `module` imported the module `used` (called `name`) or something defined in it."""
+    for value in list(vars(module).values()):
+        if value is used or getattr(value, "__module__", None) == name:
+            return True
+    return False
+
+def _testFileShape(path):
+    """
+    Returns a hash of the code of the test file at `path` outside of the
+    test methods, and a hash of every test method by "Class.methodTest".
+    The hashes don't change when code only moves to other lines.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            tree = ast.parse(file.read(), path)
+    except (OSError, SyntaxError, ValueError):
+        return None, {}
+    methods = {}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            body = []
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.endswith("Test"):
+                    methods[node.name + "." + item.name] = _hash(ast.dump(item))
+                else:
+                    body.append(item)
+            node.body = body
+    return _hash(ast.dump(tree)), methods
+
+def _hash(text):
+    return hashlib.sha1(text.encode()).hexdigest()
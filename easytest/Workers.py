@@ -0,0 +1,188 @@
+"""
+A process pool for parallel runs that, unlike multiprocessing.Pool, can
+kill a worker whose task runs too long and replace it with a new one.
+"""
+
+import os
+import tempfile
+import time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+
+class WorkerKilled:
+    """
+    Stands in for the result of a task whose worker was killed because it
+    ran past its timeout (`timedOut`), or died by itself with `exitcode`.
+    `stack` holds the lines faulthandler dumped for the worker, if any.
+    """
+    def __init__(self, elapsed, stack, timedOut=True, exitcode=None):
+        self.elapsed = elapsed
+        self.stack = stack
+        self.timedOut = timedOut
+        self.exitcode = exitcode
+
+
+class WorkerError:
+    """
+    Stands in for the result of a task that raised `error` in the worker,
+    or whose result couldn't be sent back. `errorType` is the name of the
+    class of the error and `stack` its formatted traceback. An error that
+    can't be sent back itself is replaced by its message.
+    """
+    def __init__(self, error):
+        import pickle
+        import traceback
+        self.errorType = type(error).__name__
+        self.stack = traceback.format_tb(error.__traceback__)
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = str(error)
+        self.error = error
+
+
+class WorkerPool:
+    """
+    Runs `function(task)` in `processes` worker processes. Tasks are sent
+    to the workers in chunks, and a worker still busy with a task `grace`
+    seconds after the timeout of the task has passed is killed: the task
+    yields a WorkerKilled and the rest of its chunk goes to a new worker,
+    as when a worker dies. A task that raises yields a WorkerError.
+    Leaving the with-block stops the remaining workers, which call
+    `finalizer()` before they exit unless they have to be killed.
+    """
+    grace = 2.0
+
+    def __init__(self, processes, function, initializer=None, initargs=(), finalizer=None):
+        self.processes = processes
+        self.function = function
+        self.initializer = initializer
+        self.initargs = initargs
+        self.finalizer = finalizer
+        self._workers = []
+
+    def __enter__(self):
+        for _ in range(self.processes):
+            self._workers.append(self._start())
+        return self
+
+    def __exit__(self, *exc_info):
+        for worker in self._workers:
+            if not worker["chunk"]: # an idle worker can finish by itself
+                try:
+                    worker["connection"].send(None)
+                except OSError:
+                    pass # it is gone already
+        for worker in self._workers:
+            if not worker["chunk"]:
+                worker["process"].join(self.grace)
+            self._stop(worker)
+        self._workers = []
+
+    def _start(self):
+        connection, workerConnection = multiprocessing.Pipe()
+        descriptor, dumpPath = tempfile.mkstemp(prefix="easytest-", suffix=".stack")
+        os.close(descriptor)
+        process = multiprocessing.Process(target=_workerMain, daemon=True,
+            args=(workerConnection, self.function, self.initializer, self.initargs, self.finalizer, dumpPath))
+        process.start()
+        workerConnection.close()
+        # the chunk being run, how long each task may take and when the current task started.
+        return {"process": process, "connection": connection, "dumpPath": dumpPath,
+                "chunk": deque(), "timeouts": deque(), "started": None}
+
+    def _stop(self, worker):
+        worker["process"].kill()
+        worker["process"].join()
+        worker["connection"].close()
+        os.remove(worker["dumpPath"])
+
+    def imapUnordered(self, chunks, timeout=None):
+        """
+        Yields (task, result) as the tasks finish. `chunks` are lists of
+        tasks, each sent to the next idle worker in order. `timeout(task)` returns
+        the seconds a task may take, or None to let it run as long as it takes.
+        """
+        chunks = deque(list(chunk) for chunk in chunks)
+        while chunks or any(worker["chunk"] for worker in self._workers):
+            for worker in self._workers:
+                if not worker["chunk"] and chunks:
+                    chunk = chunks.popleft()
+                    timeouts = [timeout(task) if timeout else None for task in chunk]
+                    worker["connection"].send((chunk, timeouts))
+                    worker["chunk"].extend(chunk)
+                    worker["timeouts"].extend(timeouts)
+                    worker["started"] = time.monotonic()
+            busy = [worker for worker in self._workers if worker["chunk"]]
+            deadlines = [worker["started"] + worker["timeouts"][0] + self.grace
+                         for worker in busy if worker["timeouts"][0] is not None]
+            ready = wait([worker["connection"] for worker in busy],
+                         max(0, min(deadlines) - time.monotonic()) if deadlines else None)
+            for worker in busy:
+                if worker["connection"] in ready:
+                    try:
+                        task, result = worker["connection"].recv()
+                    except EOFError: # the worker died, e.g. in a crashing extension
+                        yield self._replace(worker, chunks, timedOut=False)
+                        continue
+                    worker["chunk"].popleft()
+                    worker["timeouts"].popleft()
+                    worker["started"] = time.monotonic()
+                    yield task, result
+                elif worker["timeouts"][0] is not None and \
+                        time.monotonic() > worker["started"] + worker["timeouts"][0] + self.grace:
+                    yield self._replace(worker, chunks)
+
+    def _replace(self, worker, chunks, timedOut=True):
+        """Kills a worker stuck in (or that died in) its current task and starts another in its place."""
+        task = worker["chunk"].popleft()
+        worker["timeouts"].popleft()
+        elapsed = time.monotonic() - worker["started"]
+        if worker["chunk"]:
+            chunks.appendleft(list(worker["chunk"]))
+        exitcode = None
+        if not timedOut:
+            worker["process"].join(self.grace)
+            exitcode = worker["process"].exitcode
+        with open(worker["dumpPath"]) as file:
+            stack = file.read().splitlines(keepends=True)
+        self._stop(worker)
+        self._workers[self._workers.index(worker)] = self._start()
+        return task, WorkerKilled(elapsed, stack, timedOut, exitcode)
+
+
+def _workerMain(connection, function, initializer, initargs, finalizer, dumpPath):
+    import faulthandler
+    if initializer is not None:
+        initializer(*initargs)
+    with open(dumpPath, "w") as dumpFile:
+        # a worker that crashes, e.g. in an extension, dumps its stack as well.
+        faulthandler.enable(file=dumpFile)
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError: # the parent is gone
+                return
+            if message is None:
+                if finalizer is not None:
+                    finalizer()
+                return
+            for task, timeout in zip(*message):
+                dumpFile.seek(0)
+                dumpFile.truncate()
+                if timeout is not None:
+                    # if the task is stuck where the timeout can't interrupt it, like in
+                    # C code, this is what the parent reports when it kills the worker.
+                    faulthandler.dump_traceback_later(timeout + WorkerPool.grace / 2, file=dumpFile)
+                try:
+                    result = function(task)
+                except Exception as error:
+                    result = WorkerError(error)
+                if timeout is not None:
+                    faulthandler.cancel_dump_traceback_later()
+                try:
+                    connection.send((task, result))
+                except Exception as error: # e.g. a result that can't be pickled
+                    connection.send((task, WorkerError(error)))
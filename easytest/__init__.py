@@ -0,0 +1,6 @@
+"""
+The easytest package. Suites import the framework through the top-level
+module Easytest (`from Easytest import TestSuite`), which stands in for
+easytest.Easytest; the other modules are imported as e.g.
+`from easytest.Reporter import QuietReporter`.
+"""
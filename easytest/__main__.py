@@ -0,0 +1,7 @@
+"""The easytest command as `python -m easytest`, see Easytest.main."""
+
+import sys
+
+from .Easytest import main
+
+sys.exit(main())
@@ -0,0 +1,32 @@
+class ExpectationFailure(Exception):
+    """
+    Raised when an expectation fails. The message is rendered when the
+    exception is displayed, not when it is raised, with the expected and
+    received values shortened to `maxLength` characters.
+    """
+    maxLength = None # None means helpers.shortrepr.LIMIT
+
+    def __init__(self, *args, phrase=None, expected=None, received=None):
+        super().__init__(*args)
+        self.phrase = phrase
+        self.expected = expected
+        self.received = received
+
+    def __str__(self):
+        if self.phrase is None:
+            return super().__str__()
+        from .helpers.shortrepr import shortstr
+        return "\nExpected {}\n\t{}\nbut received\n\t{}".format(self.phrase,
+            shortstr(self.expected, self.maxLength), shortstr(self.received, self.maxLength))
+
+class TimeoutFailure(BaseException):
+    """
+    Raised in a test that ran longer than its timeout. It derives from
+    BaseException so that an `except Exception` in the test can't swallow it.
+    `stack` holds the formatted stack of the test when it was stopped, if it
+    was not stopped by raising this exception in it.
+    """
+    def __init__(self, seconds, stack=None):
+        super().__init__("Test did not finish within its timeout of {} seconds".format(seconds))
+        self.seconds = seconds
+        self.stack = stack
@@ -0,0 +1,4 @@
+from .issubset import issubset, firstMismatch
+from .subsetmatcher import compileSubset, SubsetMatcher
+from .shortrepr import shortrepr, shortstr
+from .arrays import isArray, compareArrays, allMatch
\ No newline at end of file
@@ -0,0 +1,55 @@
+import sys
+
+# Arrays are compared with numpy if it is installed, but numpy is never
+# imported here: if an object is a numpy array numpy is already imported.
+
+def isArray(obj):
+    """Returns whether obj is a numpy array, without importing numpy."""
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(obj, numpy.ndarray)
+
+class ArraySummary:
+    """
+    Describes an array comparison in a failure message,
+    so that million-element arrays are never displayed.
+    """
+    maxIndices = 5
+
+    def __init__(self, description):
+        self.description = description
+
+    @classmethod
+    def fromMask(cls, mask):
+        numpy = sys.modules["numpy"]
+        flat = numpy.flatnonzero(mask)
+        indices = [numpy.unravel_index(i, mask.shape) for i in flat[:cls.maxIndices]]
+        indices = [tuple(int(i) for i in index) for index in indices]
+        return cls("{} of {} elements differ, first at indices {}{}".format(
+            len(flat), mask.size, indices, ", ..." if len(flat) > cls.maxIndices else ""))
+
+    def __repr__(self):
+        return self.description
+
+def compareArrays(received, expected, isclose=None):
+    """
+    Compares two arrays (or an array and a scalar) elementwise in one
+    vectorized operation, with `==` or the given `isclose(received, expected)`.
+    Returns None if all elements match and an ArraySummary of the
+    differences otherwise.
+    """
+    numpy = sys.modules["numpy"]
+    received = numpy.asarray(received)
+    expected = numpy.asarray(expected)
+    if expected.shape != () and received.shape != expected.shape:
+        return ArraySummary("array of shape {} instead of {}".format(received.shape, expected.shape))
+    if isclose is None:
+        mask = received != expected
+    else:
+        mask = ~isclose(received, expected)
+    if not mask.any():
+        return None
+    return ArraySummary.fromMask(mask)
+
+def allMatch(received):
+    """The received value to display when arrays matched but shouldn't."""
+    return ArraySummary("all {} elements match".format(getattr(received, "size", 1)))
@@ -0,0 +1,94 @@
+from collections.abc import Mapping, Sequence, Set
+
+# Marks a key or index that is missing from the expected object.
+_MISSING = object()
+
+def _isSequence(obj):
+    return isinstance(obj, Sequence) and not isinstance(obj, (str, bytes, bytearray))
+
+def _check(received, expected, path):
+    """
+    Checks one level. Returns True or False if the result is known,
+    otherwise an iterator over the (received, expected, path) children
+    that all have to be subsets for `received` to be a subset.
+    """
+    if expected is _MISSING:
+        return False
+    # The expected is just a class,
+    # so check if instance of class.
+    if isinstance(expected, type):
+        return isinstance(received, expected)
+    elif isinstance(received, Mapping): # check subset for dict
+        if not isinstance(expected, Mapping):
+            return False
+        return ((value, expected.get(key, _MISSING), (path, key)) for key, value in received.items())
+    elif _isSequence(received): # check subset for list and tuple
+        if not _isSequence(expected):
+            return False
+        if not expected:
+            return len(received) == 0 # received not larger than expected if expected empty
+        # is a list of class. e.g. [int]
+        if len(expected) == 1 and isinstance(expected[0], type):
+            #check that all items are instances of that class.
+            return ((item, expected[0], (path, i)) for i, item in enumerate(received))
+        if len(received) > len(expected):
+            # the first item that is not in expected
+            return iter([(received[len(expected)], _MISSING, (path, len(expected)))])
+        return ((item, expected[i], (path, i)) for i, item in enumerate(received))
+    elif isinstance(received, Set): # check subset for set
+        if not isinstance(expected, Set):
+            return False
+        if len(expected) == 1:
+            (cls,) = expected
+            if isinstance(cls, type): # is a set of class, e.g. {int}
+                return all(isinstance(item, cls) for item in received)
+        return bool(received <= expected)
+    else: 
+         # not instance of class, so it's a leaf, just check equality.
+         # __eq__ may return a truthy non-bool, e.g. numpy.bool_.
+        return bool(received == expected)
+
+def formatPath(keys):
+    """Formats a sequence of keys and indices as a path, e.g. "$.items[3].id"."""
+    formatted = ["$"]
+    for key in keys:
+        if isinstance(key, int):
+            formatted.append("[{}]".format(key))
+        elif isinstance(key, str) and key.isidentifier():
+            formatted.append(".{}".format(key))
+        else:
+            formatted.append("[{!r}]".format(key))
+    return "".join(formatted)
+
+def _unlinkPath(path):
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    keys.reverse()
+    return keys
+
+def firstMismatch(received, expected):
+    """
+    Returns the path to the first element of `received` that makes it not
+    a subset of `expected`, e.g. "$.items[3].id", or None if it is a subset.
+    Uses an explicit stack instead of recursion, so deeply nested objects
+    don't hit the recursion limit, and stops at the first mismatch.
+    """
+    # a stack of iterators over children left to check, depth first.
+    stack = [iter([(received, expected, None)])]
+    while stack:
+        for received, expected, path in stack[-1]:
+            result = _check(received, expected, path)
+            if result is False:
+                return formatPath(_unlinkPath(path))
+            if result is not True:
+                stack.append(result)
+                break
+        else:
+            stack.pop()
+    return None
+
+def issubset(received, expected):
+    """Returns whether `received` is a subset of `expected`, see firstMismatch."""
+    return firstMismatch(received, expected) is None
@@ -0,0 +1,49 @@
+import reprlib
+from itertools import islice
+
+# Default number of characters a displayed value is shortened to.
+LIMIT = 1000
+
+class _ShortRepr(reprlib.Repr):
+    """
+    A reprlib.Repr that only looks at the first items of large containers,
+    so a summary of a huge object is as cheap as one of a small object.
+    Unlike reprlib, dicts are kept in insertion order like repr does.
+    """
+    def __init__(self, limit):
+        super().__init__()
+        self.maxlevel = 10
+        self.maxtuple = self.maxlist = self.maxarray = self.maxdict = 100
+        self.maxset = self.maxfrozenset = self.maxdeque = 100
+        self.maxstring = self.maxlong = self.maxother = limit
+
+    def repr_dict(self, x, level):
+        if not x:
+            return '{}'
+        if level <= 0:
+            return '{...}'
+        pieces = ['{}: {}'.format(self.repr1(key, level - 1), self.repr1(value, level - 1))
+                  for key, value in islice(x.items(), self.maxdict)]
+        if len(x) > self.maxdict:
+            pieces.append('...')
+        return '{{{}}}'.format(', '.join(pieces))
+
+def _shorten(text, limit):
+    if len(text) > limit:
+        return text[:max(limit - 3, 0)] + '...'
+    return text
+
+def shortrepr(obj, limit=None):
+    """
+    Returns repr(obj) for small objects. Large objects are summarized,
+    showing only their first items, and cut to `limit` characters.
+    """
+    limit = LIMIT if limit is None else limit
+    return _shorten(_ShortRepr(limit).repr(obj), limit)
+
+def shortstr(obj, limit=None):
+    """Same as shortrepr but for str(obj)."""
+    limit = LIMIT if limit is None else limit
+    if type(obj).__str__ is object.__str__: # str falls back on repr
+        return shortrepr(obj, limit)
+    return _shorten(str(obj), limit)
@@ -0,0 +1,121 @@
+from collections.abc import Mapping, Set
+
+from .issubset import _isSequence, formatPath
+
+# The compiled checks below return None if the received object passes, and
+# otherwise the keys leading to the first mismatch, innermost key first.
+
+def _compileClass(cls):
+    def check(received):
+        return None if isinstance(received, cls) else []
+    return check
+
+def _compileMapping(template):
+    children = {key: _compile(value) for key, value in template.items()}
+    def check(received):
+        if not isinstance(received, Mapping):
+            return []
+        for key, value in received.items():
+            child = children.get(key)
+            if child is None:
+                return [key]
+            mismatch = child(value)
+            if mismatch is not None:
+                mismatch.append(key)
+                return mismatch
+        return None
+    return check
+
+def _compileSequence(template):
+    if not template:
+        def check(received):
+            return None if _isSequence(received) and len(received) == 0 else []
+    elif len(template) == 1 and isinstance(template[0], type):
+        cls = template[0]
+        def check(received):
+            if not _isSequence(received):
+                return []
+            for i, item in enumerate(received):
+                if not isinstance(item, cls):
+                    return [i]
+            return None
+    else:
+        children = [_compile(item) for item in template]
+        def check(received):
+            if not _isSequence(received):
+                return []
+            if len(received) > len(children):
+                return [len(children)]
+            for i, (child, item) in enumerate(zip(children, received)):
+                mismatch = child(item)
+                if mismatch is not None:
+                    mismatch.append(i)
+                    return mismatch
+            return None
+    return check
+
+def _compileSet(template):
+    if len(template) == 1 and isinstance(next(iter(template)), type):
+        cls = next(iter(template))
+        def check(received):
+            if isinstance(received, Set) and all(isinstance(item, cls) for item in received):
+                return None
+            return []
+    else:
+        template = frozenset(template)
+        def check(received):
+            return None if isinstance(received, Set) and received <= template else []
+    return check
+
+def _compileLeaf(template):
+    def check(received):
+        return None if received == template else []
+    return check
+
+def _compile(template):
+    if isinstance(template, type):
+        return _compileClass(template)
+    elif isinstance(template, Mapping):
+        return _compileMapping(template)
+    elif _isSequence(template):
+        return _compileSequence(template)
+    elif isinstance(template, Set):
+        return _compileSet(template)
+    return _compileLeaf(template)
+
+class SubsetMatcher:
+    """
+    A subset template compiled once into nested checks, so it can be applied
+    to many values without interpreting the template again. Gives the same
+    results as issubset/firstMismatch with the template as expected object.
+    """
+    def __init__(self, template):
+        self.template = template
+        self._check = _compile(template)
+
+    def matches(self, received):
+        """Returns whether `received` is a subset of the template."""
+        return self._check(received) is None
+
+    def firstMismatch(self, received):
+        """Returns the path to the first mismatch, or None if `received` matches."""
+        mismatch = self._check(received)
+        if mismatch is None:
+            return None
+        mismatch.reverse()
+        return formatPath(mismatch)
+
+    def failingIndices(self, records):
+        """
+        Checks every record of an iterable, which can be a stream,
+        and returns the indices of the ones that don't match.
+        """
+        check = self._check
+        return [i for i, record in enumerate(records) if check(record) is not None]
+
+    def __repr__(self):
+        return "compileSubset({!r})".format(self.template)
+
+def compileSubset(template):
+    """Compiles a subset template into a reusable SubsetMatcher."""
+    return SubsetMatcher(template)
@@ -1,2 +0,0 @@
-class ExpectationFailure(Exception):
-    pass
\ No newline at end of file
@@ -1 +0,0 @@
-from helpers.issubset import issubset
\ No newline at end of file